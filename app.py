@@ -1,16 +1,22 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory, redirect, url_for, send_file
+from flask import Flask, Request, request, jsonify, render_template, send_from_directory, redirect, url_for, send_file
 import os
 import sqlite3
-import time
 import re
-from werkzeug.utils import secure_filename
+import tempfile
+import uuid
+import db
+import migrations
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from dataload import DataLoader
 from resume_parser import ResumeParserService
-from cossimilarity import SimilarityCalculator
-from matching import MatchingService
 from interview_scheduler import InterviewScheduler
-from password import send_otp, generate_candidate_id, store_candidate_data
+from pair_scores import PairScoreStore
+from resume_jobs import ResumeJobQueue
+from parse_cache import ParseCache
+from schedule_jobs import ScheduleJobRunner
+from otp_store import OtpStore, OTP_OK, OTP_NOT_FOUND, OTP_EXPIRED, OTP_TOO_MANY_ATTEMPTS
+from password import send_otp
 
 app = Flask(
     __name__,
@@ -18,63 +24,32 @@ app = Flask(
     static_folder=r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Frontend\Static"
 )
 
+# Uploads larger than this are rejected with 413 before their body is read
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_BYTES", 5 * 1024 * 1024))
+# Uploaded files stay in memory up to this size before spilling to a temporary file
+SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+
+class SpooledUploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+
+app.request_class = SpooledUploadRequest
+
 limiter = Limiter(app=app, key_func=get_remote_address)
 
-otp_storage = {}
-DB_PATH = r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Backend\DRDO_Normalized_Updated_Names.db"
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def init_db():
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(db.DB_PATH) or ".", exist_ok=True)
     try:
-        with sqlite3.connect(DB_PATH, timeout=10) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Interviewee (
-                    interviewee_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    email TEXT,
-                    phone TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Interviewer (
-                    interviewer_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    email TEXT,
-                    phone TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Interviewee_Interests (
-                    id INTEGER PRIMARY KEY,
-                    interviewee_id TEXT,
-                    field_of_interest TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Interviewer_Expertise (
-                    id INTEGER PRIMARY KEY,
-                    interviewer_id TEXT,
-                    expertise_field TEXT
-                )
-            """)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS interview_schedule (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    Interviewer_ID TEXT,
-                    Interviewee_ID TEXT,
-                    date TEXT,
-                    time TEXT
-                )
-            """)
-            conn.commit()
-        print("✅ Database initialized successfully.")
+        version = migrations.migrate()
+        print(f"✅ Database initialized successfully (schema version {version}).")
     except sqlite3.Error as e:
         print(f"❌ Error initializing database: {e}")
 
 init_db()
+ScheduleJobRunner.recover()
 
 def validate_phone_number(phone_number):
     pattern = r'^\d{10}$'
@@ -82,12 +57,12 @@ def validate_phone_number(phone_number):
 
 def validate_user_id(role, user_id):
     try:
-        with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        with db.get_connection() as conn:
             cursor = conn.cursor()
             if role == 'candidate':
-                cursor.execute("SELECT 1 FROM Interviewee WHERE interviewee_id = ?", (user_id,))
+                cursor.execute(DataLoader.VALIDATE_INTERVIEWEE_QUERY, (user_id,))
             elif role == 'expert':
-                cursor.execute("SELECT 1 FROM Interviewer WHERE interviewer_id = ?", (user_id,))
+                cursor.execute(DataLoader.VALIDATE_INTERVIEWER_QUERY, (user_id,))
             result = cursor.fetchone()
         return result is not None
     except sqlite3.Error as e:
@@ -122,8 +97,8 @@ def login():
             print(f"❌ Failed to send OTP: {error_message}")
             return render_template('login.html', error=f"Failed to send OTP: {error_message}")
 
-        otp_storage[phone_number] = {"otp": response.get("otp"), "timestamp": time.time()}
-        print(f"✅ OTP sent successfully, redirecting to verify_otp")
+        OtpStore.get().put(phone_number, response.get("otp"))
+        print(f"✅ OTP queued for delivery, redirecting to verify_otp")
         return redirect(url_for('verify_otp', role=role, user_id=user_id, phone_number=phone_number))
 
     return render_template('login.html')
@@ -142,18 +117,15 @@ def verify_otp():
         if not user_otp or not user_otp.isdigit():
             return "Invalid OTP format", 400
 
-        otp_data = otp_storage.get(phone_number)
-        if not otp_data:
+        result = OtpStore.get().verify(phone_number, user_otp)
+        if result == OTP_NOT_FOUND:
             return "OTP not found", 400
-
-        stored_otp = otp_data["otp"]
-        timestamp = otp_data["timestamp"]
-        if time.time() - timestamp > 300:
-            del otp_storage[phone_number]
+        if result == OTP_EXPIRED:
             return "OTP expired", 400
+        if result == OTP_TOO_MANY_ATTEMPTS:
+            return "Too many invalid attempts. Please request a new OTP.", 429
 
-        if int(user_otp) == stored_otp:
-            del otp_storage[phone_number]
+        if result == OTP_OK:
             print(f"✅ OTP verified for {phone_number}, redirecting to {role}_dashboard")
             return redirect(url_for(f'{role}_dashboard', user_id=user_id))
         else:
@@ -167,23 +139,13 @@ def expert_dashboard():
     if not user_id:
         return "Invalid user ID", 400
     try:
-        with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        with db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.Interviewer_ID, s.Interviewee_ID, s.date, s.time, 
-                       s.Interviewer_Email, s.Interviewee_Email,
-                       i.name AS interviewee_name
-                FROM interview_schedule s
-                JOIN Interviewee i ON s.Interviewee_ID = i.interviewee_id
-                WHERE s.Interviewer_ID = ?
-            """, (user_id,))
+            cursor.execute(DataLoader.EXPERT_SCHEDULE_QUERY, (user_id,))
             schedule = cursor.fetchall()
         print(f"✅ Loaded schedule for expert {user_id}: {len(schedule)} entries")
 
-        cosine_scores = SimilarityCalculator.compute_similarity()
-        matching_scores = MatchingService.compute_matching_scores()
-        user_cosine_scores = {pair: score for pair, score in cosine_scores.items() if pair[1] == user_id}
-        user_matching_scores = {pair: score for pair, score in matching_scores.items() if pair[1] == user_id}
+        user_scores = {row["interviewee_id"]: row for row in PairScoreStore.scheduled_scores_for_interviewer(user_id)}
 
         schedule_data = []
         for row in schedule:
@@ -196,8 +158,8 @@ def expert_dashboard():
                 "interviewer_email": row[4],  # Interviewer_Email
                 "interviewee_email": row[5],  # Interviewee_Email
                 "interviewee_name": row[6],  # Actual name from Interviewee table
-                "cosine_score": user_cosine_scores.get((interviewee_id, user_id), 0),
-                "matching_score": user_matching_scores.get((interviewee_id, user_id), 0)
+                "cosine_score": user_scores.get(interviewee_id, {}).get("cosine") or 0,
+                "matching_score": user_scores.get(interviewee_id, {}).get("matching") or 0
             })
 
         return render_template('Expert_Dashboard.html', schedule=schedule_data, user_id=user_id)
@@ -211,25 +173,19 @@ def candidate_dashboard():
     if not user_id:
         return "Invalid user ID", 400
     try:
-        with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        with db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.Interviewer_ID, s.Interviewee_ID, s.date, s.time, 
-                       i.name AS interviewer_name, i.email AS interviewer_email
-                FROM interview_schedule s
-                JOIN Interviewer i ON s.Interviewer_ID = i.interviewer_id
-                WHERE s.Interviewee_ID = ?
-            """, (user_id,))
+            cursor.execute(DataLoader.CANDIDATE_SCHEDULE_QUERY, (user_id,))
             schedule = cursor.fetchall()
 
-        cosine_scores = SimilarityCalculator.compute_similarity()
-        matching_scores = MatchingService.compute_matching_scores()
+        user_scores = {row["interviewer_id"]: row for row in PairScoreStore.scores_for_interviewee(user_id)}
 
         schedule_data = []
         for row in schedule:
             interviewer_id = row[0]
-            cosine_score = cosine_scores.get((user_id, interviewer_id), 0)
-            matching_score = matching_scores.get((user_id, interviewer_id), 0)
+            # Rows added at signup only carry the cosine score until the next refresh
+            cosine_score = user_scores.get(interviewer_id, {}).get("cosine") or 0
+            matching_score = user_scores.get(interviewer_id, {}).get("matching") or 0
             schedule_data.append({
                 "interviewer_id": interviewer_id,
                 "interviewee_id": row[1],
@@ -259,41 +215,37 @@ def candidate_signup():
         if not validate_phone_number(phone_number):
             return "Invalid phone number", 400
 
-        user_id = generate_candidate_id()
-        filename = secure_filename(resume.filename)
-        timestamp = int(time.time())
-        file_path = os.path.join(UPLOAD_FOLDER, f"{user_id}_{timestamp}_{filename}")
-        resume.save(file_path)
+        job_id = uuid.uuid4().hex
+        # The upload stays in its spooled buffer; only accepted resumes are written to the ResumeStore
+        sha256 = ParseCache.hash_upload(resume.stream)
 
         try:
-            print(f"✅ Parsing resume at path: {file_path}")
-            parsed_data = ResumeParserService.parse_resume(file_path)
-
-            name = parsed_data.get("name", "Candidate")
-            email = parsed_data.get("email", "unknown@example.com")
-            age = parsed_data.get("age", 25)
-            experience = parsed_data.get("experience", 0)
-            gate_score = parsed_data.get("gate_score", 0)
-            core_field = parsed_data.get("core_field", "General")
-
-            print(f"✅ Extracted data: Name={name}, Email={email}, Gate={gate_score}, Core Field={core_field}")
-
-            if gate_score < 1150:
+            # Re-uploads reuse the earlier parse or pre-screen; otherwise a cheap GATE check turns ineligible resumes away first
+            cached = ParseCache.get(sha256)
+            gate_score = cached.get("gate_score", 0) if cached else ResumeParserService.prescreen(resume.stream)
+            # None: the pre-screen could not read the PDF; nothing is cached and the full parse decides
+            if gate_score is not None and gate_score < ResumeParserService.GATE_CUTOFF:
+                if not cached:
+                    ParseCache.put(sha256, {"gate_score": gate_score, "prescreen_only": True})
                 return render_template(
                     'application_result.html',
                     result="not_eligible",
-                    message="Your GATE score does not meet the minimum requirement of 1150 for DRDO.",
+                    message=f"Your GATE score does not meet the minimum requirement of {ResumeParserService.GATE_CUTOFF} for DRDO.",
                     gate_score=gate_score
                 )
 
-            store_candidate_data(user_id, name, email, phone_number, age, experience, gate_score, core_field)
+            # A pre-screen entry has no parsed fields, so an eligible one (e.g. after a cut-off change) is a miss
+            if cached and cached.get("prescreen_only"):
+                cached = None
+            # Parsing runs in the resume worker pool; the candidate ID is assigned once it finishes
+            resume.stream.seek(0)
+            ResumeJobQueue.submit(job_id, resume.stream.read(), phone_number, sha256, cached)
             return render_template(
                 'application_result.html',
-                result="success",
-                message=f"Your application has been successfully submitted! Your candidate ID is {user_id}. Please note this ID for login.",
-                candidate_id=user_id
-            )
-
+                result="submitted",
+                message=f"Your resume has been received and is being processed. Your application ID is {job_id}; check its status at {url_for('resume_status', job_id=job_id)}.",
+                job_id=job_id
+            ), 202
         except sqlite3.Error as e:
             print(f"❌ SQLite error during signup: {e}")
             return render_template(
@@ -302,29 +254,78 @@ def candidate_signup():
                 message="Database error: Unable to store your data. Please try again later."
             )
         except Exception as e:
-            print(f"❌ Error processing resume: {e}")
+            print(f"❌ Error queueing resume: {e}")
             return render_template(
                 'application_result.html',
                 result="error",
-                message="There was an error processing your resume. Please ensure it's a valid PDF with all required information."
+                message="There was an error processing your resume. Please try again later."
             )
 
     return render_template('candidate_signup.html')
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    return render_template(
+        'application_result.html',
+        result="error",
+        message=f"Your resume is larger than the {round(app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024), 1):g} MB upload limit."
+    ), 413
+
+@app.route('/resume_status/<job_id>')
+def resume_status(job_id):
+    try:
+        job = ResumeJobQueue.status(job_id)
+    except sqlite3.Error as e:
+        print(f"❌ Error loading resume job {job_id}: {e}")
+        return jsonify({"message": "Database error"}), 500
+    if job is None:
+        return jsonify({"message": "Unknown job ID"}), 404
+    return jsonify(job), 200
+
+@app.route('/resume_metrics')
+def resume_metrics():
+    try:
+        parse_cache = ParseCache.stats()
+    except sqlite3.Error as e:
+        print(f"❌ Error reading parse cache stats: {e}")
+        return jsonify({"message": "Database error"}), 500
+    return jsonify({"prescreen": ResumeParserService.prescreen_stats(), "parse_cache": parse_cache}), 200
+
 @app.route('/compute_schedule', methods=['POST'])
 def compute_schedule():
     try:
-        similarity_scores = SimilarityCalculator.compute_similarity()
-        matching_scores = MatchingService.compute_matching_scores()
-        scheduler = InterviewScheduler()
-        scheduler.generate_schedule()
-        scheduler.store_schedule_in_db()
-        print(f"✅ Schedule computed and stored: {len(scheduler.schedule)} interviews")
-        return jsonify({"message": "Schedule computed successfully"}), 200
+        mode = request.args.get('mode', 'greedy')
+        if mode not in ('greedy', 'global'):
+            return jsonify({"message": "Invalid mode, expected 'greedy' or 'global'"}), 400
+        daily_capacity = request.args.get('daily_capacity')
+        if daily_capacity is not None:
+            if not daily_capacity.isdigit() or int(daily_capacity) < 1:
+                return jsonify({"message": "Invalid daily_capacity, expected a positive integer"}), 400
+            daily_capacity = int(daily_capacity)
+        incremental = request.args.get('incremental', '').lower() in ('1', 'true', 'yes')
+        notify = request.args.get('notify', '').lower() in ('1', 'true', 'yes')
+        job_id = ScheduleJobRunner.submit(mode, incremental, notify, daily_capacity)
+        return jsonify({"message": "Schedule computation queued", "job_id": job_id,
+                        "status_url": url_for('schedule_job_status', job_id=job_id)}), 202
     except Exception as e:
-        print(f"❌ Error computing schedule: {e}")
+        print(f"❌ Error queuing schedule computation: {e}")
         return jsonify({"message": "Error computing schedule"}), 500
 
+@app.route('/schedule_jobs/<job_id>', methods=['GET'])
+def schedule_job_status(job_id):
+    job = ScheduleJobRunner.status(job_id)
+    if job is None:
+        return jsonify({"message": "Unknown job ID"}), 404
+    return jsonify(job), 200
+
+@app.route('/schedule_jobs/<job_id>/cancel', methods=['POST'])
+def cancel_schedule_job(job_id):
+    if not ScheduleJobRunner.cancel(job_id):
+        if ScheduleJobRunner.status(job_id) is None:
+            return jsonify({"message": "Unknown job ID"}), 404
+        return jsonify({"message": "Job has already finished"}), 409
+    return jsonify({"message": "Cancellation requested", "job_id": job_id}), 202
+
 @app.route('/generate_resume', methods=['GET'])
 def generate_resume():
     try:
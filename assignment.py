@@ -0,0 +1,95 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from cossimilarity import SimilarityCalculator
+from dataload import DataLoader
+from matching import MatchingService
+from tfidf_model import TfidfModel
+
+class CapacityAssignment:
+    """
+    Global interviewee -> interviewer assignment with per-interviewer capacity.
+    Slots of one interviewer are interchangeable in score, so the (interviewer, slot) problem
+    reduces to a transportation problem over a sparse candidate graph. Its LP relaxation is
+    totally unimodular, so HiGHS returns an integral optimum directly.
+    """
+    # Candidate edges kept per interviewee, best combined score first
+    MAX_EDGES_PER_INTERVIEWEE = 10
+    # Added to every edge weight so placing one more interview always beats any score gain
+    PLACEMENT_BONUS = 2.0
+
+    @staticmethod
+    def build_candidate_graph(snapshot, max_edges=None):
+        """
+        Returns (interviewee_idx, interviewer_idx, combined_score) edges between same-field pairs
+        whose cosine and matching scores are both non-zero, at most max_edges per interviewee.
+        Equal scores are spread over the field's interviewers so ties do not pile onto one expert.
+        """
+        max_edges = max_edges or CapacityAssignment.MAX_EDGES_PER_INTERVIEWEE
+        interviewees_df = snapshot.interviewees
+        interviewers_df = snapshot.interviewers
+        if interviewees_df.empty or interviewers_df.empty:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=float)
+
+        model = TfidfModel.get(snapshot)
+        interviewee_vectors = model["vectorizer"].transform(interviewees_df["core_field"].fillna('').astype(str).tolist())
+        interviewer_vectors = model["interviewer_matrix"]
+        inputs = MatchingService.encode_inputs(interviewees_df, interviewers_df, snapshot.skills)
+
+        valid_interviewers = DataLoader.valid_interviewer_mask(interviewers_df)
+        interviewee_fields = inputs["interviewee_fields"]
+        interviewer_fields = inputs["interviewer_fields"]
+
+        edges = []
+        for field in np.unique(interviewee_fields):
+            cols = np.flatnonzero((interviewer_fields == field) & valid_interviewers)
+            if not len(cols):
+                continue
+            field_rows = np.flatnonzero(interviewee_fields == field)
+            for start in range(0, len(field_rows), SimilarityCalculator.BLOCK_SIZE):
+                rows = field_rows[start:start + SimilarityCalculator.BLOCK_SIZE]
+                cosine = (interviewee_vectors[rows] @ interviewer_vectors[cols].T).toarray()
+                matching = MatchingService.score_block(inputs, rows, cols)
+                combined = np.where((cosine > 0) & (matching > 0), cosine + matching, 0.0)
+                # Rotate the tie order per interviewee so equal scores spread across the field
+                rotation = ((np.arange(len(cols))[None, :] - rows[:, None]) % len(cols)) / len(cols)
+                block_rows, block_cols, _ = SimilarityCalculator.select_matches(combined - 1e-9 * rotation, max_edges)
+                edges.append((rows[block_rows], cols[block_cols], combined[block_rows, block_cols]))
+
+        if not edges:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=float)
+        return tuple(np.concatenate(parts) for parts in zip(*edges))
+
+    @staticmethod
+    def solve(rows, cols, scores, interviewee_ids, interviewer_ids, capacities, placement_bonus=None):
+        """
+        Picks edges maximizing placements, then total score, so that every interviewee ID is used
+        at most once and every interviewer ID at most capacities[interviewer_id] times.
+        Returns a boolean mask over the edges.
+        """
+        if not len(rows):
+            return np.zeros(0, dtype=bool)
+        placement_bonus = CapacityAssignment.PLACEMENT_BONUS if placement_bonus is None else placement_bonus
+
+        edge_count = len(rows)
+        interviewee_keys, interviewee_index = np.unique(np.asarray(interviewee_ids, dtype=object)[rows].astype(str), return_inverse=True)
+        interviewer_keys, interviewer_index = np.unique(np.asarray(interviewer_ids, dtype=object)[cols].astype(str), return_inverse=True)
+        capacity_by_key = {str(interviewer_id): capacity for interviewer_id, capacity in capacities.items()}
+
+        ones = np.ones(edge_count)
+        edge_index = np.arange(edge_count)
+        constraints = sparse.vstack([
+            sparse.csr_matrix((ones, (interviewee_index, edge_index)), shape=(len(interviewee_keys), edge_count)),
+            sparse.csr_matrix((ones, (interviewer_index, edge_index)), shape=(len(interviewer_keys), edge_count)),
+        ]).tocsr()
+        limits = np.concatenate([
+            np.ones(len(interviewee_keys)),
+            np.array([capacity_by_key.get(key, 0) for key in interviewer_keys], dtype=float),
+        ])
+
+        result = linprog(-(np.asarray(scores, dtype=float) + placement_bonus), A_ub=constraints, b_ub=limits,
+                         bounds=(0, 1), method="highs")
+        if not result.success:
+            print(f"❌ Assignment solver failed: {result.message}")
+            return np.zeros(edge_count, dtype=bool)
+        return result.x > 0.5
@@ -0,0 +1,37 @@
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from resume_parser import NlpWorker, ResumeParserService
+
+def time_parses(paths):
+    """Per-resume parse_resume wall times in milliseconds, with the parser's logging silenced."""
+    timings = []
+    for path in paths:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ResumeParserService.parse_resume(path)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def run(count=20):
+    """Parses the same sample resumes with per-call model loads (cold), then through a warmed NlpWorker."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            paths = [ResumeParserService.create_resume_pdf(os.path.join(tmp_dir, f"resume{i}.pdf")) for i in range(count)]
+        cold = time_parses(paths)
+        started = time.perf_counter()
+        NlpWorker.warm_up()
+        warm_up_ms = (time.perf_counter() - started) * 1000
+        warm = time_parses(paths)
+    print(f"{'mode':>6} {'resumes':>8} {'mean ms':>9} {'median ms':>10} {'max ms':>9}")
+    for mode, timings in (("cold", cold), ("warm", warm)):
+        print(f"{mode:>6} {len(timings):>8} {statistics.mean(timings):>9.1f} {statistics.median(timings):>10.1f} {max(timings):>9.1f}")
+    print(f"warm-up took {warm_up_ms:.1f} ms, speedup {statistics.mean(cold) / statistics.mean(warm):.1f}x")
+
+if __name__ == '__main__':
+    # python bench_resume_parser.py [resumes]
+    run(*[int(arg) for arg in sys.argv[1:2]])
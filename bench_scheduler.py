@@ -0,0 +1,54 @@
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from dataload import DataSnapshot
+from interview_scheduler import InterviewScheduler
+from tfidf_model import TfidfModel
+
+def build_snapshot(experts, interviews_per_expert):
+    """One expert per field, each receiving interviews_per_expert candidates of that field."""
+    fields = [f"field{e}" for e in range(experts)]
+    interviewers = pd.DataFrame({
+        "interviewer_id": [f"EXP{e:04d}" for e in range(experts)],
+        "name": [f"Expert {e}" for e in range(experts)],
+        "email": [f"expert{e}@drdo.in" for e in range(experts)],
+        "phone": ["9000000000"] * experts,
+        "field_of_expertise": fields,
+    })
+    count = experts * interviews_per_expert
+    interviewees = pd.DataFrame({
+        "user_id": [f"CAND{i:06d}" for i in range(count)],
+        "name": [f"Candidate {i}" for i in range(count)],
+        "email": [f"cand{i}@example.com" for i in range(count)],
+        "phone": ["9111111111"] * count,
+        "core_field": [fields[i % experts] for i in range(count)],
+    })
+    skills = pd.concat([
+        interviewees[["user_id", "core_field"]].rename(columns={"core_field": "skill"}),
+        interviewers[["interviewer_id", "field_of_expertise"]].rename(
+            columns={"interviewer_id": "user_id", "field_of_expertise": "skill"}),
+    ])
+    return DataSnapshot(interviewees, interviewers, skills)
+
+def run(experts=20, loads=(10, 50, 100, 250, 500, 1000)):
+    print(f"{'interviews/expert':>18} {'interviews':>11} {'schedule s':>11} {'us/interview':>13}")
+    for load in loads:
+        snapshot = build_snapshot(experts, load)
+        start_date = datetime(2025, 5, 1)
+        # Size the window so every candidate fits
+        days = math.ceil(load / 12)
+        scheduler = InterviewScheduler(snapshot, start_date, start_date + timedelta(days=days - 1))
+        started = time.perf_counter()
+        scheduler.generate_schedule()
+        elapsed = time.perf_counter() - started
+        booked = len(scheduler.schedule)
+        print(f"{load:>18} {booked:>11} {elapsed:>11.3f} {elapsed / max(booked, 1) * 1e6:>13.1f}")
+
+if __name__ == '__main__':
+    # Keep the benchmark's TF-IDF model out of the real model location
+    TfidfModel.MODEL_PATH = os.path.join(tempfile.mkdtemp(), "tfidf_model.joblib")
+    run(*[int(arg) for arg in sys.argv[1:2]])
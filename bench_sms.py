@@ -0,0 +1,51 @@
+import contextlib
+import io
+import statistics
+import sys
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import sms_stub_server
+from sms_dispatcher import SmsDispatcher
+
+API_KEY = "stub-key"
+
+def session_per_call(numbers, message, api_key):
+    """The previous send path: a new session and retry adapter for every message, blocking the caller."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])))
+    response = session.post(SmsDispatcher.URL, data={"message": message, "language": "english", "route": "q", "numbers": numbers},
+                            headers={"authorization": api_key}, timeout=SmsDispatcher.TIMEOUT)
+    return {"return": response.json().get("return", False)}
+
+def measure(send, count):
+    """Returns (per-call handler latencies in ms, messages/s until every message was accepted)."""
+    latencies, handles = [], []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            call_started = time.perf_counter()
+            handles.append(send(f"{9000000000 + i}", "Benchmark message", API_KEY))
+            latencies.append((time.perf_counter() - call_started) * 1000)
+        results = [handle.result() if hasattr(handle, "result") else handle for handle in handles]
+    elapsed = time.perf_counter() - started
+    assert all(result["return"] for result in results), "stub rejected a message"
+    return latencies, count / elapsed
+
+def run(count=100, latency=0.05):
+    server = sms_stub_server.start(latency=latency)
+    SmsDispatcher.URL = server.url
+    print(f"stub latency {latency * 1000:.0f} ms, {count} messages, {SmsDispatcher.WORKERS} dispatcher workers")
+    print(f"{'mode':>22} {'handler mean ms':>16} {'handler p95 ms':>15} {'msgs/s':>8}")
+    for mode, send in (("session per call", session_per_call),
+                       ("pooled, blocking", SmsDispatcher.send),
+                       ("pooled, dispatched", SmsDispatcher.dispatch)):
+        latencies, throughput = measure(send, count)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{mode:>22} {statistics.mean(latencies):>16.2f} {p95:>15.2f} {throughput:>8.1f}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    # python bench_sms.py [messages] [stub latency seconds]
+    run(*[int(arg) for arg in sys.argv[1:2]], *[float(arg) for arg in sys.argv[2:3]])
@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import db
+import migrations
+from password import reserve_candidate_ids
+from resume_parser import NlpWorker, ResumeParserService
+
+BATCH_SIZE = 200
+# Parses kept in flight per worker, so results stream without queueing the whole directory
+IN_FLIGHT_PER_WORKER = 4
+
+def _parse_file(file_path):
+    """Pool entry point: returns (file_path, parsed resume fields); empty fields mean the parse failed."""
+    gate_score = ResumeParserService.prescreen(file_path)
+    # None: the pre-screen could not read the PDF, so leave the verdict to the full parse
+    if gate_score is not None and gate_score < ResumeParserService.GATE_CUTOFF:
+        # Ineligible: skip the full parse, the GATE score is all store_batch needs
+        return file_path, {"gate_score": gate_score, "prescreen_only": True}
+    parsed_data = ResumeParserService.parse_resume(file_path)
+    parsed_data.pop("full_text", None)
+    return file_path, parsed_data
+
+def pending_files(directory):
+    """Returns the directory's PDFs that have not been imported yet; failed files are retried."""
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names if name.lower().endswith(".pdf")
+    )
+    with db.get_connection() as conn:
+        finished = {row[0] for row in conn.execute("SELECT file_path FROM bulk_import_log WHERE status != 'error'")}
+    return [path for path in files if os.path.abspath(path) not in finished]
+
+def store_batch(results, phone="Unknown"):
+    """
+    Inserts one batch of parse results in a single transaction: eligible candidates get a block
+    of IDs reserved in that transaction, and every file is logged so an interrupted import
+    resumes after it.
+    Returns the number of candidates inserted.
+    """
+    candidates, interests, log_rows = [], [], []
+    now = time.time()
+    with db.transaction(immediate=True) as conn:
+        eligible = sum(bool(parsed_data) and parsed_data.get("gate_score", 0) >= ResumeParserService.GATE_CUTOFF
+                       for _, parsed_data in results)
+        candidate_ids = iter(reserve_candidate_ids(eligible) if eligible else [])
+        for file_path, parsed_data in results:
+            file_path = os.path.abspath(file_path)
+            if not parsed_data:
+                log_rows.append((file_path, "error", None, None, now))
+                continue
+            gate_score = parsed_data.get("gate_score", 0)
+            if gate_score < ResumeParserService.GATE_CUTOFF:
+                log_rows.append((file_path, "not_eligible", None, gate_score, now))
+                continue
+            candidate_id = next(candidate_ids)
+            candidates.append((candidate_id, parsed_data.get("name", "Candidate"),
+                               parsed_data.get("email", "unknown@example.com"), parsed_data.get("phone") or phone))
+            interests.append((candidate_id, parsed_data.get("core_field", "General")))
+            log_rows.append((file_path, "imported", candidate_id, gate_score, now))
+        conn.executemany("""
+            INSERT INTO Interviewee (interviewee_id, name, email, phone)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(interviewee_id) DO UPDATE SET
+                name = excluded.name,
+                email = excluded.email,
+                phone = excluded.phone
+        """, candidates)
+        conn.executemany("""
+            INSERT INTO Interviewee_Interests (interviewee_id, field_of_interest)
+            VALUES (?, ?)
+        """, interests)
+        conn.executemany("""
+            INSERT OR REPLACE INTO bulk_import_log (file_path, status, candidate_id, gate_score, imported_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, log_rows)
+    return len(candidates)
+
+def import_directory(directory, workers=None, batch_size=BATCH_SIZE):
+    """Parses every pending PDF under directory across a process pool, storing results in batches."""
+    files = pending_files(directory)
+    print(f"📂 {len(files)} resumes to import from {directory}")
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    parsed, inserted, rejected, batch = 0, 0, 0, []
+    with ProcessPoolExecutor(max_workers=workers, initializer=NlpWorker.warm_up) as executor:
+        remaining = iter(files)
+        in_flight = {executor.submit(_parse_file, path) for path in
+                     (path for _, path in zip(range(workers * IN_FLIGHT_PER_WORKER), remaining))}
+        while in_flight:
+            done = next(as_completed(in_flight))
+            in_flight.remove(done)
+            next_path = next(remaining, None)
+            if next_path is not None:
+                in_flight.add(executor.submit(_parse_file, next_path))
+            try:
+                batch.append(done.result())
+            except Exception as e:
+                print(f"❌ Resume worker failed: {e}")
+                continue
+            parsed += 1
+            # Only pre-screen rejections count; unreadable PDFs and low scores found by the full parse do not
+            parsed_data = batch[-1][1]
+            rejected += bool(parsed_data) and bool(parsed_data.get("prescreen_only"))
+            if len(batch) >= batch_size or not in_flight:
+                inserted += store_batch(batch)
+                batch = []
+                elapsed = time.perf_counter() - start
+                print(f"✅ {parsed}/{len(files)} parsed, {inserted} imported ({parsed / elapsed:.1f} resumes/s)")
+    if batch:
+        inserted += store_batch(batch)
+    elapsed = time.perf_counter() - start
+    rate = parsed / elapsed if elapsed else 0.0
+    print(f"✅ Imported {inserted} of {parsed} parsed resumes in {elapsed:.1f}s ({rate:.1f} resumes/s)")
+    print(f"✅ Pre-screen: {rejected} rejected before the full parse")
+    return {"parsed": parsed, "imported": inserted, "rejected": rejected, "seconds": elapsed, "resumes_per_second": rate}
+
+if __name__ == '__main__':
+    # python bulk_import.py <directory> [--workers N] [--batch-size N]; rerun to resume after an interruption
+    parser = argparse.ArgumentParser(description="Bulk import a directory of PDF resumes.")
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+    migrations.migrate()
+    import_directory(args.directory, args.workers, args.batch_size)
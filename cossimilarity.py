@@ -1,78 +1,177 @@
+import numpy as np
+from scipy import sparse
 from dataload import DataLoader
-from sklearn.feature_extraction.text import TfidfVectorizer
+from tfidf_model import TfidfModel
 from sklearn.metrics.pairwise import cosine_similarity
 
 class SimilarityCalculator:
     """Computes cosine and Jaccard similarity between interviewers and interviewees."""
 
+    BLOCK_SIZE = 4096
+
+    @staticmethod
+    def select_matches(scores, top_k=None, threshold=0.0, row_offset=0):
+        """
+        Picks the best (or top_k best) columns of every row of a dense or sparse score matrix.
+        Returns (row_idx, col_idx, score) arrays holding only picks with score > threshold,
+        ordered by row, then by descending score and ascending column like argmax.
+        """
+        if sparse.issparse(scores):
+            scores = scores.toarray()
+        scores = np.asarray(scores, dtype=float)
+        n_rows, n_cols = scores.shape
+        if n_rows == 0 or n_cols == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=float)
+
+        if not top_k or top_k == 1:
+            cols = scores.argmax(axis=1)[:, None]
+        else:
+            k = min(top_k, n_cols)
+            cols = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            picked = np.take_along_axis(scores, cols, axis=1)
+            cols = np.take_along_axis(cols, np.lexsort((cols, -picked), axis=1), axis=1)
+
+        picked = np.take_along_axis(scores, cols, axis=1)
+        rows = np.broadcast_to(np.arange(n_rows)[:, None], cols.shape)
+        keep = picked > threshold
+        return rows[keep] + row_offset, cols[keep], picked[keep]
+
+    @staticmethod
+    def _no_matches(as_arrays):
+        if as_arrays:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=float)
+        return {}
+
     @staticmethod
-    def compute_similarity():
+    def compute_similarity(snapshot=None, top_k=None, threshold=0.0, as_arrays=False):
+        """
+        Maps (interviewee_id, interviewer_id) to the cosine similarity of the best interviewer
+        (or the top_k interviewers) per interviewee with a score above threshold.
+        With as_arrays=True returns (interviewee_idx, interviewer_idx, score) arrays of
+        positional row indices into the snapshot DataFrames instead of a dict.
+        """
         try:
-            interviewees_df = DataLoader.load_interviewees()
-            interviewers_df = DataLoader.load_interviewers()
+            if snapshot is None:
+                snapshot = DataLoader.load_snapshot()
+            interviewees_df = snapshot.interviewees
+            interviewers_df = snapshot.interviewers
 
             if interviewees_df.empty or interviewers_df.empty:
                 print("❌ Data is empty for similarity calculation.")
-                return {}
+                return SimilarityCalculator._no_matches(as_arrays)
 
-            # Extract core fields and expertise as text data
+            # Extract core fields as text data; the interviewer side comes from the cached model
             interviewee_fields = interviewees_df["core_field"].fillna('').astype(str).tolist()
-            interviewer_fields = interviewers_df["field_of_expertise"].fillna('').astype(str).tolist()
-
-            vectorizer = TfidfVectorizer()
-            tfidf_matrix = vectorizer.fit_transform(interviewee_fields + interviewer_fields)
-
-            # Compute cosine similarity between interviewees and interviewers
-            relevance_scores = cosine_similarity(
-                tfidf_matrix[:len(interviewee_fields)],
-                tfidf_matrix[len(interviewee_fields):]
-            )
-
-            # Find the highest similarity score per interviewee
-            similarity_map = {}
-            for i in range(len(interviewees_df)):
-                interviewee_id = interviewees_df.iloc[i]["user_id"]
-                max_score = 0
-                best_interviewer = None
-                for j in range(len(interviewers_df)):
-                    score = relevance_scores[i, j]
-                    if score > max_score:
-                        max_score = score
-                        best_interviewer = interviewers_df.iloc[j]["interviewer_id"]
-                if best_interviewer:
-                    similarity_map[(interviewee_id, best_interviewer)] = max_score
+
+            # Reuse the persisted vectorizer and interviewer matrix instead of refitting on every call
+            model = TfidfModel.get(snapshot)
+            interviewee_vectors = model["vectorizer"].transform(interviewee_fields)
+            interviewer_vectors = model["interviewer_matrix"]
+
+            # Score interviewees in blocks so the dense score matrix stays bounded in memory
+            matches = []
+            for start in range(0, len(interviewee_fields), SimilarityCalculator.BLOCK_SIZE):
+                relevance_scores = cosine_similarity(
+                    interviewee_vectors[start:start + SimilarityCalculator.BLOCK_SIZE],
+                    interviewer_vectors
+                )
+                matches.append(SimilarityCalculator.select_matches(relevance_scores, top_k, threshold, start))
+            rows, cols, scores = (np.concatenate(parts) for parts in zip(*matches))
+
+            interviewer_ids = interviewers_df["interviewer_id"].to_numpy()
+            keep = DataLoader.valid_interviewer_mask(interviewers_df)[cols]
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+            if as_arrays:
+                print(f"✅ Computed {len(scores)} similarity matches.")
+                return rows, cols, scores
+
+            interviewee_ids = interviewees_df["user_id"].to_numpy()
+            similarity_map = dict(zip(zip(interviewee_ids[rows], interviewer_ids[cols]), scores))
 
             print(f"✅ Computed highest similarity scores for {len(similarity_map)} interviewees.")
             return similarity_map
 
         except Exception as e:
             print(f"❌ Error computing similarity: {e}")
-            return {}
-# Jaccard similarity remains unchanged as we won't modify it for this requirement
+            return SimilarityCalculator._no_matches(as_arrays)
+    @staticmethod
+    def incidence_matrix(item_sets, vocabulary):
+        """Encodes a list of sets as a binary CSR matrix over vocabulary, adding unseen items to it."""
+        indptr, indices = [0], []
+        for items in item_sets:
+            for item in items:
+                indices.append(vocabulary.setdefault(item, len(vocabulary)))
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(item_sets), len(vocabulary))
+        )
 
     @staticmethod
-    def compute_jaccard_similarity():
+    def compute_jaccard_similarity(snapshot=None, top_k=None, threshold=None, as_arrays=False):
+        """
+        Maps every (interviewee_id, interviewer_id) pair to the Jaccard similarity of their field tokens.
+        Passing top_k and/or threshold keeps only the top_k pairs per interviewee with a score above
+        threshold (default 0), so memory stays bounded by the number of emitted pairs.
+        With as_arrays=True returns (interviewee_idx, interviewer_idx, score) arrays instead of a dict.
+        """
         try:
-            interviewees_df = DataLoader.load_interviewees()
-            interviewers_df = DataLoader.load_interviewers()
+            if snapshot is None:
+                snapshot = DataLoader.load_snapshot()
+            interviewees_df = snapshot.interviewees
+            interviewers_df = snapshot.interviewers
 
             if interviewees_df.empty or interviewers_df.empty:
                 print("❌ Data is empty for Jaccard calculation.")
-                return {}
+                return SimilarityCalculator._no_matches(as_arrays)
+
+            # Encode the token sets once as binary incidence matrices over a shared vocabulary
+            vocabulary = {}
+            interviewee_tokens = SimilarityCalculator.incidence_matrix(
+                [set(str(field).lower().split()) for field in interviewees_df["core_field"]], vocabulary)
+            interviewer_tokens = SimilarityCalculator.incidence_matrix(
+                [set(str(field).lower().split()) for field in interviewers_df["field_of_expertise"]], vocabulary)
+            interviewee_tokens.resize(interviewee_tokens.shape[0], len(vocabulary))
+            interviewer_tokens_t = interviewer_tokens.T.tocsc()
+            interviewee_sizes = np.asarray(interviewee_tokens.sum(axis=1)).ravel()
+            interviewer_sizes = np.asarray(interviewer_tokens.sum(axis=1)).ravel()
+
+            all_pairs = top_k is None and threshold is None
+            threshold = 0.0 if threshold is None else threshold
+            matches = []
+            for start in range(0, len(interviewees_df), SimilarityCalculator.BLOCK_SIZE):
+                stop = min(start + SimilarityCalculator.BLOCK_SIZE, len(interviewees_df))
+                # |A ∩ B| for the whole block in one sparse product, |A ∪ B| = |A| + |B| - |A ∩ B|
+                intersections = (interviewee_tokens[start:stop] @ interviewer_tokens_t).tocoo()
+                if all_pairs:
+                    intersections = intersections.toarray()
+                    unions = interviewee_sizes[start:stop, None] + interviewer_sizes[None, :] - intersections
+                    scores = np.divide(intersections, unions, out=np.zeros(unions.shape), where=unions != 0)
+                    rows, cols = np.indices(scores.shape)
+                    matches.append((rows.ravel() + start, cols.ravel(), scores.ravel()))
+                    continue
 
-            jaccard_scores = {}
-            for _, interviewee in interviewees_df.iterrows():
-                e_set = set(str(interviewee["core_field"]).lower().split())
+                # Pairs without a shared token score 0, so only the sparse intersections can pass the threshold
+                unions = interviewee_sizes[start + intersections.row] + interviewer_sizes[intersections.col] - intersections.data
+                scores = sparse.coo_matrix(
+                    (intersections.data / unions, (intersections.row, intersections.col)),
+                    shape=intersections.shape
+                )
+                if top_k:
+                    matches.append(SimilarityCalculator.select_matches(scores, top_k, threshold, start))
+                else:
+                    keep = scores.data > threshold
+                    matches.append((scores.row[keep] + start, scores.col[keep], scores.data[keep]))
 
-                for _, interviewer in interviewers_df.iterrows():
-                    i_set = set(str(interviewer["field_of_expertise"]).lower().split())
-                    intersection = len(e_set & i_set)
-                    union = len(e_set | i_set)
-                    score = intersection / union if union != 0 else 0
-                    jaccard_scores[(interviewee["user_id"], interviewer["interviewer_id"])] = score
+            rows, cols, scores = (np.concatenate(parts) for parts in zip(*matches))
+            if as_arrays:
+                return rows, cols, scores
 
-            return jaccard_scores
+            interviewee_ids = interviewees_df["user_id"].to_numpy()
+            interviewer_ids = interviewers_df["interviewer_id"].to_numpy()
+            return dict(zip(zip(interviewee_ids[rows], interviewer_ids[cols]), scores.tolist()))
 
         except Exception as e:
             print(f"❌ Error computing Jaccard similarity: {e}")
-            return {}
\ No newline at end of file
+            return SimilarityCalculator._no_matches(as_arrays)
@@ -1,22 +1,74 @@
+import numpy as np
 import pandas as pd
 import sqlite3
+import db
+
+class DataSnapshot:
+    """Consistent view of interviewees, interviewers and skills shared by one scoring/scheduling run."""
+
+    def __init__(self, interviewees, interviewers, skills, data_version=None):
+        self.interviewees = interviewees
+        self.interviewers = interviewers
+        self.skills = skills
+        self.data_version = data_version
 
 class DataLoader:
     """Handles loading data from SQLite database."""
-    DB_PATH = r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Backend\DRDO_Normalized_Updated_Names.db"
+    # Join Interviewee and Interviewee_Interests for full interviewee data
+    INTERVIEWEES_QUERY = """
+        SELECT i.interviewee_id AS user_id, i.name, i.email, i.phone, ii.field_of_interest AS core_field
+        FROM Interviewee i
+        LEFT JOIN Interviewee_Interests ii ON i.interviewee_id = ii.interviewee_id
+    """
+    # Join Interviewer and Interviewers for full interviewer data
+    INTERVIEWERS_QUERY = """
+        SELECT i.interviewer_id, i.name, i.email, i.phone, ie.expertise_field AS field_of_expertise
+        FROM Interviewer i
+        LEFT JOIN Interviewer_Expertise ie ON i.interviewer_id = ie.interviewer_id
+    """
+    SKILLS_QUERY = """
+        SELECT ii.interviewee_id AS user_id, ii.field_of_interest AS skill 
+        FROM Interviewee_Interests ii
+        UNION ALL
+        SELECT ie.interviewer_id, ie.expertise_field AS skill 
+        FROM Interviewer_Expertise ie
+    """
+    DATA_VERSION_QUERY = "SELECT version FROM Data_Version WHERE name = 'scores'"
+    # Login checks that a user ID exists
+    VALIDATE_INTERVIEWEE_QUERY = "SELECT 1 FROM Interviewee WHERE interviewee_id = ?"
+    VALIDATE_INTERVIEWER_QUERY = "SELECT 1 FROM Interviewer WHERE interviewer_id = ?"
+    # Dashboard reads of the stored schedule
+    EXPERT_SCHEDULE_QUERY = """
+        SELECT s.Interviewer_ID, s.Interviewee_ID, s.date, s.time, 
+               s.Interviewer_Email, s.Interviewee_Email,
+               i.name AS interviewee_name
+        FROM interview_schedule s
+        JOIN Interviewee i ON s.Interviewee_ID = i.interviewee_id
+        WHERE s.Interviewer_ID = ?
+    """
+    CANDIDATE_SCHEDULE_QUERY = """
+        SELECT s.Interviewer_ID, s.Interviewee_ID, s.date, s.time, 
+               i.name AS interviewer_name, i.email AS interviewer_email
+        FROM interview_schedule s
+        JOIN Interviewer i ON s.Interviewer_ID = i.interviewer_id
+        WHERE s.Interviewee_ID = ?
+    """
+    # Result columns of the loader queries, so a failed load still yields frames of the same shape
+    INTERVIEWEE_COLUMNS = ["user_id", "name", "email", "phone", "core_field"]
+    INTERVIEWER_COLUMNS = ["interviewer_id", "name", "email", "phone", "field_of_expertise"]
+    SKILL_COLUMNS = ["user_id", "skill"]
+
+    @staticmethod
+    def valid_interviewer_mask(interviewers_df):
+        """Boolean mask over interviewers_df rows; interviewers without an ID never count as a match."""
+        return np.array([bool(interviewer_id) for interviewer_id in interviewers_df["interviewer_id"]], dtype=bool)
 
     @staticmethod
     def load_interviewees():
         """Loads registered interviewees from the database."""
         try:
-            with sqlite3.connect(DataLoader.DB_PATH) as conn:
-                # Join Interviewee and Interviewee_Interests for full interviewee data
-                query = """
-                    SELECT i.interviewee_id AS user_id, i.name, i.email, i.phone, ii.field_of_interest AS core_field
-                    FROM Interviewee i
-                    LEFT JOIN Interviewee_Interests ii ON i.interviewee_id = ii.interviewee_id
-                """
-                df = pd.read_sql_query(query, conn)
+            with db.get_connection() as conn:
+                df = pd.read_sql_query(DataLoader.INTERVIEWEES_QUERY, conn)
             return df
         except Exception as e:
             print(f"❌ Error loading interviewees: {e}")
@@ -26,14 +78,8 @@ class DataLoader:
     def load_interviewers():
         """Loads interviewer data from the database."""
         try:
-            with sqlite3.connect(DataLoader.DB_PATH) as conn:
-                # Join Interviewer and Interviewers for full interviewer data
-                query = """
-                    SELECT i.interviewer_id, i.name, i.email, i.phone, ie.expertise_field AS field_of_expertise
-                    FROM Interviewer i
-                    LEFT JOIN Interviewer_Expertise ie ON i.interviewer_id = ie.interviewer_id
-                """
-                df = pd.read_sql_query(query, conn)
+            with db.get_connection() as conn:
+                df = pd.read_sql_query(DataLoader.INTERVIEWERS_QUERY, conn)
             return df
         except Exception as e:
             print(f"❌ Error loading interviewers: {e}")
@@ -43,16 +89,46 @@ class DataLoader:
     def load_skills():
         """Loads skills data by joining Interviewee_Interests and Interviewers tables."""
         try:
-            with sqlite3.connect(DataLoader.DB_PATH) as conn:
-                query = """
-                    SELECT ii.interviewee_id AS user_id, ii.field_of_interest AS skill 
-                    FROM Interviewee_Interests ii
-                    UNION ALL
-                    SELECT ie.interviewer_id, ie.expertise_field AS skill 
-                    FROM Interviewer_Expertise ie
-                """
-                df = pd.read_sql_query(query, conn)
+            with db.get_connection() as conn:
+                df = pd.read_sql_query(DataLoader.SKILLS_QUERY, conn)
             return df
         except Exception as e:
             print(f"❌ Error loading skills: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+    @staticmethod
+    def _read_data_version(conn):
+        try:
+            row = conn.execute(DataLoader.DATA_VERSION_QUERY).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    @staticmethod
+    def get_data_version():
+        """Returns the score data version bumped by the Data_Version triggers, or None if unavailable."""
+        try:
+            with db.get_connection() as conn:
+                return DataLoader._read_data_version(conn)
+        except Exception as e:
+            print(f"❌ Error loading data version: {e}")
+            return None
+
+    @staticmethod
+    def load_snapshot():
+        """Loads interviewees, interviewers, skills and the data version in a single read transaction."""
+        try:
+            with db.transaction() as conn:
+                snapshot = DataSnapshot(
+                    interviewees=pd.read_sql_query(DataLoader.INTERVIEWEES_QUERY, conn),
+                    interviewers=pd.read_sql_query(DataLoader.INTERVIEWERS_QUERY, conn),
+                    skills=pd.read_sql_query(DataLoader.SKILLS_QUERY, conn),
+                    data_version=DataLoader._read_data_version(conn)
+                )
+            print(f"✅ Loaded data snapshot: {len(snapshot.interviewees)} interviewees, {len(snapshot.interviewers)} interviewers.")
+            return snapshot
+        except Exception as e:
+            print(f"❌ Error loading data snapshot: {e}")
+            return DataSnapshot(pd.DataFrame(columns=DataLoader.INTERVIEWEE_COLUMNS),
+                                pd.DataFrame(columns=DataLoader.INTERVIEWER_COLUMNS),
+                                pd.DataFrame(columns=DataLoader.SKILL_COLUMNS))
\ No newline at end of file
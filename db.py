@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Single database location for the app, loaders, parser and scripts; override with DRDO_DB_PATH
+DB_PATH = os.getenv(
+    "DRDO_DB_PATH",
+    r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Backend\DRDO_Normalized_Updated_Names.db"
+)
+BUSY_TIMEOUT = 10
+# Per-connection cache of prepared statements, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+PRAGMAS = (
+    # WAL lets dashboard reads run concurrently with signup writes
+    "PRAGMA journal_mode=WAL",
+    # Safe with WAL: only the last transactions can be lost on power failure, never corrupted
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_local = threading.local()
+
+def set_db_path(path):
+    """Points every subsequently requested connection at path."""
+    global DB_PATH
+    DB_PATH = path
+    close_connection()
+
+def get_connection():
+    """Returns this thread's pooled connection, opening and tuning it on first use."""
+    conn = getattr(_local, "conn", None)
+    # Connections must not cross a fork or a path change
+    if conn is not None and _local.pid == os.getpid() and _local.path == DB_PATH:
+        return conn
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    _local.conn, _local.pid, _local.path = conn, os.getpid(), DB_PATH
+    return conn
+
+def close_connection():
+    """Closes this thread's pooled connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = None
+
+@contextmanager
+def transaction(immediate=False):
+    """
+    Runs the block in one transaction on the pooled connection, committing on success and
+    rolling back on error. Nested blocks join the transaction that is already open.
+    """
+    conn = get_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
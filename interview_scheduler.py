@@ -1,67 +1,229 @@
 import sqlite3
+import db
 from datetime import datetime, timedelta
-import pandas as pd
-from dataload import DataLoader
+import numpy as np
+from dataload import DataLoader, DataSnapshot
 from cossimilarity import SimilarityCalculator
 from matching import MatchingService
+from assignment import CapacityAssignment
+
+class SlotGrid:
+    """
+    Interview slots of a scheduling window, addressed as day * slots_per_day + slot.
+    Occupancy is tracked per interviewer in a bytearray, so finding a free slot is a
+    find-first-zero scan; dates and times are only formatted when a slot is booked.
+    """
+    DAILY_START = timedelta(hours=10)
+    DAILY_END = timedelta(hours=17)
+    LUNCH_START = timedelta(hours=13)
+    LUNCH_END = LUNCH_START + timedelta(minutes=30)
+    SLOT_DURATION = timedelta(minutes=30)
+    BREAK_AFTER_3 = timedelta(minutes=2)
+
+    def __init__(self, start_date, end_date):
+        self.days = [start_date + timedelta(days=d) for d in range((end_date - start_date).days + 1)]
+        self.slot_times = self._build_day_slots()
+        self.slots_per_day = len(self.slot_times)
+        self.size = len(self.days) * self.slots_per_day
+        self.day_labels = [day.strftime('%Y-%m-%d') for day in self.days]
+        self.time_labels = [(self._format_time(t), self._format_time(t + self.SLOT_DURATION)) for t in self.slot_times]
+        self._slot_index = {time_label[0]: i for i, time_label in enumerate(self.time_labels)}
+        self._day_index = {day_label: d for d, day_label in enumerate(self.day_labels)}
+
+    def _build_day_slots(self):
+        # Walk the day like an interviewer whose every slot is taken: skip lunch and
+        # add a short break after every 3 interviews
+        slots = []
+        current_time = self.DAILY_START
+        interviews_done = 0
+        while current_time + self.SLOT_DURATION <= self.DAILY_END:
+            if self.LUNCH_START <= current_time < self.LUNCH_END:
+                current_time = self.LUNCH_END
+                continue
+            if interviews_done > 0 and interviews_done % 3 == 0:
+                current_time += self.BREAK_AFTER_3
+            slots.append(current_time)
+            current_time += self.SLOT_DURATION
+            interviews_done += 1
+        return slots
+
+    @staticmethod
+    def _format_time(delta):
+        minutes = int(delta.total_seconds()) // 60
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def new_occupancy(self):
+        return bytearray(self.size)
+
+    def first_free(self, occupancy, start=0):
+        """Returns the earliest free slot index at or after start, or -1 if the window is full."""
+        return occupancy.find(0, start)
+
+    def slot_of(self, date_label, start_time_label):
+        """Maps a stored date/start time back to its slot index, or None if it is outside the grid."""
+        day = self._day_index.get(date_label)
+        slot = self._slot_index.get(start_time_label)
+        if day is None or slot is None:
+            return None
+        return day * self.slots_per_day + slot
+
+    def labels(self, index):
+        day, slot = divmod(index, self.slots_per_day)
+        start_label, end_label = self.time_labels[slot]
+        return self.day_labels[day], start_label, end_label
 
 class InterviewScheduler:
-    def __init__(self):
-        self.interviewees = DataLoader.load_interviewees()
-        self.interviewers = DataLoader.load_interviewers()
-        self.similarity_scores = SimilarityCalculator.compute_similarity()
-        self.matching_scores = MatchingService.compute_matching_scores()
+    START_DATE = datetime(2025, 5, 1)
+    END_DATE = datetime(2025, 5, 5)
+
+    # Assignment progress is reported every this many interviewees
+    PROGRESS_EVERY = 500
+
+    def __init__(self, snapshot=None, start_date=None, end_date=None, daily_capacity=None, incremental=False, progress=None):
+        # Optional progress(stage, done, total) callback; an exception it raises aborts the run
+        self.progress = progress
+        self._report("loading", 0, 0)
+        # Load the data once and score it on the same consistent view
+        self.snapshot = snapshot if snapshot is not None else DataLoader.load_snapshot()
+        # Incremental runs keep the persisted bookings and only score and place the rest
+        self.incremental = incremental
+        self.existing_schedule = self.load_existing_schedule() if incremental else []
+        booked = {row[1] for row in self.existing_schedule}
+        if booked:
+            unscheduled = ~self.snapshot.interviewees['user_id'].isin(booked)
+            self.snapshot = DataSnapshot(self.snapshot.interviewees[unscheduled].reset_index(drop=True),
+                                         self.snapshot.interviewers, self.snapshot.skills, self.snapshot.data_version)
+        self.interviewees = self.snapshot.interviewees
+        self.interviewers = self.snapshot.interviewers
+        self._report("loading", len(self.interviewees), len(self.interviewees))
+        # Best-match maps of the greedy mode, computed on its first run; the global mode scores its own graph
+        self.similarity_scores = None
+        self.matching_scores = None
+        self.grid = SlotGrid(start_date or self.START_DATE, end_date or self.END_DATE)
+        # Maximum interviews per expert per day; None allows every slot of the day
+        self.daily_capacity = daily_capacity
         self.schedule = []
+        self.summary = {}
 
-    def generate_schedule(self):
-        start_date = datetime(2025, 5, 1)
-        end_date = datetime(2025, 5, 5)
-        daily_start = timedelta(hours=10)
-        daily_end = timedelta(hours=17)
-        lunch_start = timedelta(hours=13)
-        lunch_end = lunch_start + timedelta(minutes=30)
-        slot_duration = timedelta(minutes=30)
-        break_after_3 = timedelta(minutes=2)
+    def _report(self, stage, done, total):
+        if self.progress is not None:
+            self.progress(stage, done, total)
 
-        # Track scheduled interviewees to avoid duplicates
-        scheduled_interviewees = set()
-        # Dictionary to store each expert's schedule
-        expert_schedules = {interviewer['interviewer_id']: [] for _, interviewer in self.interviewers.iterrows()}
+    def build_field_index(self):
+        """Maps each normalized field to its interviewers as (interviewer_id, email), in DataFrame order."""
+        field_index = {}
+        for interviewer_id, field, email in zip(self.interviewers['interviewer_id'],
+                                                self.interviewers['field_of_expertise'],
+                                                self.interviewers['email']):
+            field_index.setdefault(str(field).lower(), []).append((interviewer_id, email))
+        return field_index
 
-        # Process each interviewee
-        for _, interviewee in self.interviewees.iterrows():
-            interviewee_id = interviewee['user_id']
-            interviewee_field = str(interviewee['core_field']).lower()
+    def compute_greedy_scores(self):
+        """Computes the best-match similarity and matching maps once per scheduler."""
+        if self.similarity_scores is None:
+            self._report("scoring", 0, 2)
+            self.similarity_scores = SimilarityCalculator.compute_similarity(self.snapshot)
+            self._report("scoring", 1, 2)
+            self.matching_scores = MatchingService.compute_matching_scores(self.snapshot)
+            self._report("scoring", 2, 2)
 
-            # Skip if already scheduled
-            if interviewee_id in scheduled_interviewees:
+    def build_pair_scores(self):
+        """Joins similarity and matching scores per interviewee, keeping only pairs where both are non-zero."""
+        pair_scores = {}
+        for (interviewee_id, interviewer_id), sim_score in self.similarity_scores.items():
+            match_score = self.matching_scores.get((interviewee_id, interviewer_id), 0)
+            if sim_score == 0 or match_score == 0:
                 continue
+            pair_scores.setdefault(interviewee_id, {})[interviewer_id] = sim_score + match_score
+        return pair_scores
 
-            # Find all interviewers with the same field
-            matching_interviewers = []
-            for _, interviewer in self.interviewers.iterrows():
-                interviewer_id = interviewer['interviewer_id']
-                interviewer_field = str(interviewer['field_of_expertise']).lower()
+    def new_occupancy(self):
+        """Returns an interviewer's occupancy map with the slots beyond the daily capacity blocked."""
+        occupancy = self.grid.new_occupancy()
+        if self.daily_capacity is not None and self.daily_capacity < self.grid.slots_per_day:
+            blocked = self.grid.slots_per_day - self.daily_capacity
+            for day in range(len(self.grid.days)):
+                end = (day + 1) * self.grid.slots_per_day
+                occupancy[end - blocked:end] = b"\x01" * blocked
+        return occupancy
 
-                # Check if fields match
-                if interviewee_field != interviewer_field:
-                    continue
+    def _book(self, interviewer_id, interviewer_email, interviewee_id, interviewee_email):
+        # Book the interviewer's earliest free slot within the allowed time frame
+        occupancy = self._occupancy[interviewer_id]
+        slot = self.grid.first_free(occupancy)
+        if slot < 0:
+            return False
+        occupancy[slot] = 1
+        date_label, start_label, end_label = self.grid.labels(slot)
+        self._expert_schedules[interviewer_id].append({
+            "Date": date_label,
+            "Start_Time": start_label,
+            "End_Time": end_label,
+            "Interviewee_ID": interviewee_id,
+            "Interviewer_ID": interviewer_id,
+            "Interviewer_Email": interviewer_email,
+            "Interviewee_Email": interviewee_email
+        })
+        return True
 
-                # Check similarity and matching scores
-                pair = (interviewee_id, interviewer_id)
-                sim_score = self.similarity_scores.get(pair, 0)
-                match_score = self.matching_scores.get(pair, 0)
+    def generate_schedule(self, mode="greedy"):
+        """
+        Builds the schedule. "greedy" gives every interviewee its single top-scoring interviewer in
+        DataFrame order; "global" solves the assignment over all candidates with per-expert capacity.
+        """
+        # Each expert's bookings and slot occupancy
+        self.schedule = []
+        self._expert_schedules = {interviewer_id: [] for interviewer_id in self.interviewers['interviewer_id']}
+        self._occupancy = {interviewer_id: self.new_occupancy() for interviewer_id in self._expert_schedules}
+        for interviewer_id, _, date_label, time_label in self.existing_schedule:
+            slot = self.grid.slot_of(date_label, str(time_label).split('-')[0])
+            if slot is not None and interviewer_id in self._occupancy:
+                self._occupancy[interviewer_id][slot] = 1
 
-                # Skip if either score is 0
-                if sim_score == 0 or match_score == 0:
-                    continue
+        if mode == "global":
+            placed, total_score = self._assign_global()
+        else:
+            placed, total_score = self._assign_greedy()
 
-                # Calculate combined score
-                combined_score = sim_score + match_score
+        # Combine all expert schedules into the final schedule
+        for interviewer_id, expert_schedule in self._expert_schedules.items():
+            self.schedule.extend(expert_schedule)
+
+        self.summary = {"mode": mode, "placed": placed, "total_score": float(total_score)}
+        print(f"✅ Generated {mode} schedule with {len(self.schedule)} interviews across {len(self._expert_schedules)} experts "
+              f"(total score {total_score:.2f}).")
+        return self.summary
+
+    def _assign_greedy(self):
+        self.compute_greedy_scores()
+        field_index = self.build_field_index()
+        pair_scores = self.build_pair_scores()
+
+        # Track scheduled interviewees to avoid duplicates
+        scheduled_interviewees = set()
+        total_score = 0.0
+
+        # Process each interviewee
+        total = len(self.interviewees)
+        interviewees = zip(self.interviewees['user_id'], self.interviewees['core_field'], self.interviewees['email'])
+        for position, (interviewee_id, core_field, interviewee_email) in enumerate(interviewees):
+            if position % self.PROGRESS_EVERY == 0:
+                self._report("assigning", position, total)
+            # Skip if already scheduled or without any scored interviewer
+            if interviewee_id in scheduled_interviewees or interviewee_id not in pair_scores:
+                continue
+            candidate_scores = pair_scores[interviewee_id]
+
+            # Only interviewers with the same field are considered
+            matching_interviewers = []
+            for interviewer_id, email in field_index.get(str(core_field).lower(), ()):
+                combined_score = candidate_scores.get(interviewer_id)
+                if combined_score is None:
+                    continue
                 matching_interviewers.append({
                     'interviewer_id': interviewer_id,
                     'combined_score': combined_score,
-                    'email': interviewer['email']
+                    'email': email
                 })
 
             # If no matching interviewers found, skip this interviewee
@@ -73,86 +235,87 @@ class InterviewScheduler:
 
             # Select the interviewer with the highest score
             best_interviewer = matching_interviewers[0]
-            interviewer_id = best_interviewer['interviewer_id']
-            interviewer_email = best_interviewer['email']
-
-            # Schedule the interview within the allowed time frame
-            current_date = start_date
-            scheduled = False
-            while current_date <= end_date and not scheduled:
-                current_time = daily_start
-                interviews_done = 0
-
-                while current_time + slot_duration <= daily_end:
-                    # Skip lunch break
-                    if lunch_start <= current_time < lunch_end:
-                        current_time = lunch_end
-                        continue
-
-                    # Add a break after every 3 interviews
-                    if interviews_done > 0 and interviews_done % 3 == 0:
-                        current_time += break_after_3
-
-                    # Check if this slot is within the deadline (end_date and daily_end)
-                    interview_datetime = datetime.combine(current_date, datetime.min.time()) + current_time
-                    deadline_datetime = datetime.combine(end_date, datetime.min.time()) + daily_end
-                    if interview_datetime > deadline_datetime:
-                        break
-
-                    # Check if the interviewer already has an interview at this time
-                    slot_taken = False
-                    for scheduled_interview in expert_schedules[interviewer_id]:
-                        scheduled_date = datetime.strptime(scheduled_interview['Date'], '%Y-%m-%d')
-                        scheduled_start = datetime.strptime(scheduled_interview['Start_Time'], '%H:%M')
-                        # Convert scheduled_start to a timedelta
-                        scheduled_time_delta = timedelta(hours=scheduled_start.hour, minutes=scheduled_start.minute)
-                        scheduled_datetime = datetime.combine(scheduled_date, datetime.min.time()) + scheduled_time_delta
-                        current_slot_datetime = datetime.combine(current_date, datetime.min.time()) + current_time
-                        if scheduled_datetime == current_slot_datetime:
-                            slot_taken = True
-                            break
-
-                    if slot_taken:
-                        current_time += slot_duration
-                        interviews_done += 1
-                        continue
-
-                    # Schedule the interview
-                    expert_schedules[interviewer_id].append({
-                        "Date": current_date.strftime('%Y-%m-%d'),
-                        "Start_Time": (datetime.combine(datetime.today(), datetime.min.time()) + current_time).strftime('%H:%M'),
-                        "End_Time": (datetime.combine(datetime.today(), datetime.min.time()) + current_time + slot_duration).strftime('%H:%M'),
-                        "Interviewee_ID": interviewee_id,
-                        "Interviewer_ID": interviewer_id,
-                        "Interviewer_Email": interviewer_email,
-                        "Interviewee_Email": interviewee['email']
-                    })
-
-                    # Mark interviewee as scheduled
-                    scheduled_interviewees.add(interviewee_id)
-                    scheduled = True
-                    break
-
-                current_date += timedelta(days=1)
+            if self._book(best_interviewer['interviewer_id'], best_interviewer['email'], interviewee_id, interviewee_email):
+                # Mark interviewee as scheduled
+                scheduled_interviewees.add(interviewee_id)
+                total_score += best_interviewer['combined_score']
 
-        # Combine all expert schedules into the final schedule
-        for interviewer_id, expert_schedule in expert_schedules.items():
-            self.schedule.extend(expert_schedule)
+        self._report("assigning", total, total)
+        return len(scheduled_interviewees), total_score
+
+    def _assign_global(self):
+        total = len(self.interviewees)
+        self._report("scoring", 0, 1)
+        rows, cols, scores = CapacityAssignment.build_candidate_graph(self.snapshot)
+        self._report("scoring", 1, 1)
+        self._report("assigning", 0, total)
+        capacities = {interviewer_id: occupancy.count(0) for interviewer_id, occupancy in self._occupancy.items()}
+        interviewee_ids = self.interviewees['user_id'].to_numpy()
+        interviewer_ids = self.interviewers['interviewer_id'].to_numpy()
+        chosen = CapacityAssignment.solve(rows, cols, scores, interviewee_ids, interviewer_ids, capacities)
+
+        # Book in interviewee order so earlier applicants get earlier slots
+        interviewee_emails = self.interviewees['email'].to_numpy()
+        interviewer_emails = self.interviewers['email'].to_numpy()
+        scheduled_interviewees = set()
+        total_score = 0.0
+        for edge in np.flatnonzero(chosen)[np.argsort(rows[chosen], kind='stable')]:
+            interviewee_id = interviewee_ids[rows[edge]]
+            if interviewee_id in scheduled_interviewees:
+                continue
+            if self._book(interviewer_ids[cols[edge]], interviewer_emails[cols[edge]], interviewee_id, interviewee_emails[rows[edge]]):
+                scheduled_interviewees.add(interviewee_id)
+                total_score += scores[edge]
+                if len(scheduled_interviewees) % self.PROGRESS_EVERY == 0:
+                    self._report("assigning", len(scheduled_interviewees), total)
+        self._report("assigning", total, total)
+        return len(scheduled_interviewees), total_score
 
-        print(f"✅ Generated schedule with {len(self.schedule)} interviews across {len(expert_schedules)} experts.")
+    def compare_modes(self):
+        """Runs both assignment modes on the same scores and returns their summaries, keeping the global schedule."""
+        greedy = self.generate_schedule("greedy")
+        global_ = self.generate_schedule("global")
+        print(f"📊 Greedy placed {greedy['placed']} (score {greedy['total_score']:.2f}), "
+              f"global placed {global_['placed']} (score {global_['total_score']:.2f}).")
+        return {"greedy": greedy, "global": global_}
+
+    def load_existing_schedule(self):
+        """Returns the persisted bookings as (interviewer_id, interviewee_id, date, time) tuples."""
+        try:
+            with db.get_connection() as conn:
+                return conn.execute(
+                    "SELECT Interviewer_ID, Interviewee_ID, date, time FROM interview_schedule"
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"❌ Error loading existing schedule: {e}")
+            return []
 
     def store_schedule_in_db(self):
+        """
+        Replaces the stored schedule, or in incremental mode upserts only the new bookings, in one
+        transaction. Returns whether the schedule was stored.
+        """
+        rows = [(entry["Interviewer_ID"], entry["Interviewee_ID"], entry["Date"],
+                 f"{entry['Start_Time']}-{entry['End_Time']}", entry["Interviewer_Email"], entry["Interviewee_Email"])
+                for entry in self.schedule]
+        self._report("persisting", 0, len(rows))
         try:
-            conn = sqlite3.connect(DataLoader.DB_PATH)
-            df_schedule = pd.DataFrame(self.schedule)
-            df_schedule = df_schedule.rename(columns={
-                "Date": "date",
-                "Start_Time": "time"
-            })
-            df_schedule["time"] = df_schedule["time"] + "-" + df_schedule["End_Time"]
-            df_schedule = df_schedule.drop(columns=["End_Time"])
-            df_schedule.to_sql('interview_schedule', conn, if_exists='replace', index=False)
-            conn.close()
-            print("✅ Schedule stored in the database table 'interview_schedule'.")
+            with db.transaction() as conn:
+                if not self.incremental:
+                    conn.execute("DELETE FROM interview_schedule")
+                conn.executemany("""
+                    INSERT INTO interview_schedule
+                        (Interviewer_ID, Interviewee_ID, date, time, Interviewer_Email, Interviewee_Email)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(Interviewee_ID) DO UPDATE SET
+                        Interviewer_ID = excluded.Interviewer_ID,
+                        date = excluded.date,
+                        time = excluded.time,
+                        Interviewer_Email = excluded.Interviewer_Email,
+                        Interviewee_Email = excluded.Interviewee_Email
+                """, rows)
+            print(f"✅ Stored {len(rows)} interviews in the database table 'interview_schedule'.")
+            return True
         except Exception as e:
-            print(f"❌ Error storing schedule in DB: {e}")
\ No newline at end of file
+            print(f"❌ Error storing schedule in DB: {e}")
+            return False
@@ -1,3 +1,4 @@
+import numpy as np
 from dataload import DataLoader
 from sklearn.linear_model import LinearRegression
 from cossimilarity import SimilarityCalculator
@@ -8,67 +9,138 @@ class MatchingService:
     Trains a regression model on both.
     """
 
+    FIELD_WEIGHT = 0.6
+    SKILL_WEIGHT = 0.4
+
+    @staticmethod
+    def encode_inputs(interviewees_df, interviewers_df, skills_df):
+        """Encodes skills as sparse incidence matrices and normalized fields as integer codes."""
+        skills_dict = skills_df.groupby("user_id")["skill"].apply(set).to_dict() if not skills_df.empty else {}
+        vocabulary = {}
+        interviewee_skills = SimilarityCalculator.incidence_matrix(
+            [skills_dict.get(user_id, set()) for user_id in interviewees_df["user_id"]], vocabulary)
+        interviewer_skills = SimilarityCalculator.incidence_matrix(
+            [skills_dict.get(interviewer_id, set()) for interviewer_id in interviewers_df["interviewer_id"]], vocabulary)
+        interviewee_skills.resize(interviewee_skills.shape[0], len(vocabulary))
+
+        field_codes = {}
+        interviewee_fields = np.array(
+            [field_codes.setdefault(str(field).lower(), len(field_codes)) for field in interviewees_df["core_field"]], dtype=int)
+        interviewer_fields = np.array(
+            [field_codes.setdefault(str(field).lower(), len(field_codes)) for field in interviewers_df["field_of_expertise"]], dtype=int)
+
+        return {
+            "interviewee_skills": interviewee_skills,
+            "interviewer_skills_t": interviewer_skills.T.tocsc(),
+            "skill_counts": np.maximum(np.asarray(interviewee_skills.sum(axis=1)).ravel(), 1),
+            "interviewee_fields": interviewee_fields,
+            "interviewer_fields": interviewer_fields,
+        }
+
     @staticmethod
-    def compute_matching_scores():
-        interviewees_df = DataLoader.load_interviewees()
-        interviewers_df = DataLoader.load_interviewers()
-        skills_df = DataLoader.load_skills()
+    def score_block(inputs, rows, cols=None):
+        """
+        Returns the dense matching score matrix for the given interviewee rows (and interviewer cols):
+        FIELD_WEIGHT * field equality + SKILL_WEIGHT * shared skills / interviewee skill count.
+        """
+        skills_t = inputs["interviewer_skills_t"]
+        interviewer_fields = inputs["interviewer_fields"]
+        if cols is not None:
+            skills_t = skills_t[:, cols]
+            interviewer_fields = interviewer_fields[cols]
+
+        common_skills = (inputs["interviewee_skills"][rows] @ skills_t).toarray()
+        skill_score = common_skills / inputs["skill_counts"][rows][:, None]
+        field_score = (inputs["interviewee_fields"][rows][:, None] == interviewer_fields[None, :]).astype(float)
+        return MatchingService.FIELD_WEIGHT * field_score + MatchingService.SKILL_WEIGHT * skill_score
+
+    @staticmethod
+    def score_pairs(inputs, rows, cols):
+        """Element-wise counterpart of score_block: the matching scores of the (rows[i], cols[i]) pairs."""
+        common_skills = inputs["interviewee_skills"][rows].multiply(inputs["interviewer_skills_t"].T.tocsr()[cols])
+        skill_score = np.asarray(common_skills.sum(axis=1)).ravel() / inputs["skill_counts"][rows]
+        field_score = (inputs["interviewee_fields"][rows] == inputs["interviewer_fields"][cols]).astype(float)
+        return MatchingService.FIELD_WEIGHT * field_score + MatchingService.SKILL_WEIGHT * skill_score
+
+    @staticmethod
+    def compute_score_matrix(snapshot=None):
+        """Returns the full interviewee x interviewer matching score matrix in snapshot row order."""
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        interviewees_df = snapshot.interviewees
+        interviewers_df = snapshot.interviewers
+        skills_df = snapshot.skills
 
         if interviewees_df.empty or interviewers_df.empty:
             print("❌ Data is empty for matching score computation.")
-            return {}
+            return np.zeros((len(interviewees_df), len(interviewers_df)))
 
-        matching_scores = {}
-        skills_dict = skills_df.groupby("user_id")["skill"].apply(set).to_dict()
+        inputs = MatchingService.encode_inputs(interviewees_df, interviewers_df, skills_df)
+        return MatchingService.score_block(inputs, slice(None))
 
-        for _, interviewee in interviewees_df.iterrows():
-            interviewee_id = interviewee["user_id"]
-            interviewee_skills = skills_dict.get(interviewee_id, set())
-            interviewee_field = str(interviewee["core_field"]).lower()
+    @staticmethod
+    def compute_matching_scores(snapshot=None, top_k=None, threshold=0.0, as_arrays=False):
+        """
+        Maps (interviewee_id, interviewer_id) to the matching score of the best interviewer
+        (or the top_k interviewers) per interviewee with a score above threshold.
+        With as_arrays=True returns (interviewee_idx, interviewer_idx, score) arrays instead of a dict.
+        """
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        interviewees_df = snapshot.interviewees
+        interviewers_df = snapshot.interviewers
+        skills_df = snapshot.skills
 
-            max_score = 0
-            best_interviewer = None
-            for _, interviewer in interviewers_df.iterrows():
-                interviewer_id = interviewer["interviewer_id"]
-                interviewer_skills = skills_dict.get(interviewer_id, set())
-                interviewer_field = str(interviewer["field_of_expertise"]).lower()
+        if interviewees_df.empty or interviewers_df.empty:
+            print("❌ Data is empty for matching score computation.")
+            return SimilarityCalculator._no_matches(as_arrays)
 
-                # Skill-based matching score
-                common_skills = len(interviewee_skills & interviewer_skills)
-                skill_score = common_skills / max(len(interviewee_skills), 1)
+        inputs = MatchingService.encode_inputs(interviewees_df, interviewers_df, skills_df)
+        matches = []
+        for start in range(0, len(interviewees_df), SimilarityCalculator.BLOCK_SIZE):
+            block = MatchingService.score_block(inputs, slice(start, start + SimilarityCalculator.BLOCK_SIZE))
+            matches.append(SimilarityCalculator.select_matches(block, top_k, threshold, start))
+        rows, cols, scores = (np.concatenate(parts) for parts in zip(*matches))
 
-                # Field-based matching score
-                field_score = 1.0 if interviewee_field == interviewer_field else 0.0
+        interviewer_ids = interviewers_df["interviewer_id"].to_numpy()
+        keep = DataLoader.valid_interviewer_mask(interviewers_df)[cols]
+        rows, cols, scores = rows[keep], cols[keep], scores[keep]
 
-                # Combine scores
-                combined_score = 0.6 * field_score + 0.4 * skill_score
-                if combined_score > max_score:
-                    max_score = combined_score
-                    best_interviewer = interviewer_id
+        if as_arrays:
+            print(f"✅ Computed {len(scores)} matching scores.")
+            return rows, cols, scores
 
-            if best_interviewer:
-                matching_scores[(interviewee_id, best_interviewer)] = max_score
+        interviewee_ids = interviewees_df["user_id"].to_numpy()
+        matching_scores = dict(zip(zip(interviewee_ids[rows], interviewer_ids[cols]), scores))
 
         print(f"✅ Computed highest matching scores for {len(matching_scores)} pairs.")
         return matching_scores
 
     @staticmethod
-    def train_linear_regression():
-        # Load similarity and matching scores
-        cosine_scores = SimilarityCalculator.compute_similarity()
-        jaccard_scores = SimilarityCalculator.compute_jaccard_similarity()
-        matching_scores = MatchingService.compute_matching_scores()
+    def train_linear_regression(snapshot=None):
+        # Load similarity and matching scores from one shared snapshot
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        cosine_scores = SimilarityCalculator.compute_similarity(snapshot)
+        jaccard_scores = SimilarityCalculator.compute_jaccard_similarity(snapshot)
+        matching_scores = MatchingService.compute_matching_scores(snapshot)
 
         if not all([cosine_scores, jaccard_scores, matching_scores]):
             print("❌ Insufficient data for regression training.")
             return None
+        return MatchingService.fit_regression(cosine_scores, jaccard_scores, matching_scores)
 
+    @staticmethod
+    def fit_regression(cosine_scores, jaccard_scores, matching_scores):
+        """
+        Fits the regression on pairs present in both the cosine and matching maps.
+        Pairs missing from jaccard_scores count as 0, so a thresholded Jaccard map can be passed.
+        """
         # Prepare training data: Combine cosine, Jaccard, and matching scores as features
         X, y = [], []
-        all_pairs = set(cosine_scores.keys()) & set(jaccard_scores.keys()) & set(matching_scores.keys())
+        all_pairs = set(cosine_scores.keys()) & set(matching_scores.keys())
 
         for pair in all_pairs:
-            interviewee_id, interviewer_id = pair
             cosine = cosine_scores.get(pair, 0)
             jaccard = jaccard_scores.get(pair, 0)
             match = matching_scores.get(pair, 0)
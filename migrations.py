@@ -0,0 +1,352 @@
+import re
+import sys
+import db
+
+# Canonical interview_schedule layout; older to_sql-created tables are rebuilt into it
+SCHEDULE_COLUMNS = ["id", "Interviewer_ID", "Interviewee_ID", "date", "time", "Interviewer_Email", "Interviewee_Email"]
+SCORE_TABLES = ("Interviewee", "Interviewer", "Interviewee_Interests", "Interviewer_Expertise")
+
+def _create_base_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Interviewee (
+            interviewee_id TEXT PRIMARY KEY,
+            name TEXT,
+            email TEXT,
+            phone TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Interviewer (
+            interviewer_id TEXT PRIMARY KEY,
+            name TEXT,
+            email TEXT,
+            phone TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Interviewee_Interests (
+            id INTEGER PRIMARY KEY,
+            interviewee_id TEXT,
+            field_of_interest TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Interviewer_Expertise (
+            id INTEGER PRIMARY KEY,
+            interviewer_id TEXT,
+            expertise_field TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS interview_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Interviewer_ID TEXT,
+            Interviewee_ID TEXT,
+            date TEXT,
+            time TEXT,
+            Interviewer_Email TEXT,
+            Interviewee_Email TEXT
+        )
+    """)
+
+def _normalize_schedule_table(conn):
+    # Rebuild tables whose layout was replaced by pandas to_sql, keeping the last row per interviewee
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(interview_schedule)")]
+    if columns != SCHEDULE_COLUMNS:
+        copied = ", ".join(column if column in columns else "NULL" for column in SCHEDULE_COLUMNS[1:])
+        conn.execute("DROP TABLE IF EXISTS interview_schedule_new")
+        conn.execute("""
+            CREATE TABLE interview_schedule_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Interviewer_ID TEXT,
+                Interviewee_ID TEXT,
+                date TEXT,
+                time TEXT,
+                Interviewer_Email TEXT,
+                Interviewee_Email TEXT
+            )
+        """)
+        conn.execute(f"""
+            INSERT INTO interview_schedule_new ({", ".join(SCHEDULE_COLUMNS[1:])})
+            SELECT {copied} FROM interview_schedule
+            WHERE rowid IN (SELECT MAX(rowid) FROM interview_schedule GROUP BY Interviewee_ID)
+            ORDER BY rowid
+        """)
+        conn.execute("DROP TABLE interview_schedule")
+        conn.execute("ALTER TABLE interview_schedule_new RENAME TO interview_schedule")
+    # One interview per interviewee; incremental placement upserts on it
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_interview_schedule_interviewee
+        ON interview_schedule (Interviewee_ID)
+    """)
+
+def _create_data_version(conn):
+    # Bump the score data version on every write the similarity/matching scores depend on
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Data_Version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO Data_Version (name, version) VALUES ('scores', 0)")
+    for table in SCORE_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE Data_Version SET version = version + 1 WHERE name = 'scores';
+                END
+            """)
+
+def _create_hot_path_indexes(conn):
+    # Covering indexes for the loader LEFT JOINs, and the expert dashboard's interviewer lookup
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_interviewee_interests_interviewee
+        ON Interviewee_Interests (interviewee_id, field_of_interest)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_interviewer_expertise_interviewer
+        ON Interviewer_Expertise (interviewer_id, expertise_field)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_interview_schedule_interviewer
+        ON interview_schedule (Interviewer_ID)
+    """)
+    conn.execute("ANALYZE")
+
+def _create_pair_scores(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pair_scores (
+            interviewee_id TEXT NOT NULL,
+            interviewer_id TEXT NOT NULL,
+            cosine REAL,
+            jaccard REAL,
+            matching REAL,
+            regression REAL,
+            PRIMARY KEY (interviewee_id, interviewer_id)
+        ) WITHOUT ROWID
+    """)
+    # Per-interviewer top-k reads walk this index in score order
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_pair_scores_interviewer
+        ON pair_scores (interviewer_id, regression DESC)
+    """)
+
+def _create_resume_jobs(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resume_jobs (
+            job_id TEXT PRIMARY KEY,
+            phone TEXT,
+            file_path TEXT,
+            status TEXT NOT NULL,
+            candidate_id TEXT,
+            gate_score INTEGER,
+            core_field TEXT,
+            message TEXT,
+            created_at REAL,
+            updated_at REAL
+        )
+    """)
+
+def _create_bulk_import_log(conn):
+    # One row per resume file seen by bulk_import.py, so reruns skip what is already done
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_import_log (
+            file_path TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            candidate_id TEXT,
+            gate_score INTEGER,
+            imported_at REAL
+        )
+    """)
+
+def _create_parse_cache(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS parse_cache (
+            sha256 TEXT PRIMARY KEY,
+            parsed TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL,
+            last_used_at REAL
+        )
+    """)
+    # Eviction walks entries from the most recently used down
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_parse_cache_last_used
+        ON parse_cache (last_used_at)
+    """)
+
+def _create_id_sequence(conn):
+    # Next number to hand out per ID series, seeded past every existing CAND#### ID
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS Id_Sequence (
+            name TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO Id_Sequence (name, next_value)
+        SELECT 'candidate', MAX(
+            COUNT(*),
+            COALESCE(MAX(CASE WHEN interviewee_id GLOB 'CAND[0-9]*' THEN CAST(SUBSTR(interviewee_id, 5) AS INTEGER) END), 0)
+        ) + 1
+        FROM Interviewee
+    """)
+
+def _create_otp_codes(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS otp_codes (
+            phone_number TEXT PRIMARY KEY,
+            otp INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Lets the sweeper delete expired codes without scanning live ones
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_otp_codes_expires_at
+        ON otp_codes (expires_at)
+    """)
+
+def _create_notification_status(conn):
+    # One row per schedule notification recipient and message text
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS notification_status (
+            recipient_id TEXT NOT NULL,
+            message TEXT NOT NULL,
+            phone TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at REAL,
+            PRIMARY KEY (recipient_id, message)
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS ix_notification_status_status
+        ON notification_status (status)
+    """)
+
+def _create_schedule_jobs(conn):
+    # One row per background schedule computation, with its current stage and progress counts
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schedule_jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            incremental INTEGER NOT NULL DEFAULT 0,
+            stage TEXT,
+            done INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            summary TEXT,
+            error TEXT,
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+def _add_schedule_job_capacity(conn):
+    # Per-expert daily interview limit the job was run with; NULL allows every slot of the day
+    conn.execute("ALTER TABLE schedule_jobs ADD COLUMN daily_capacity INTEGER")
+
+def _add_schedule_job_ownership(conn):
+    # Process that queued the job, so a restart can tell orphaned jobs from ones another worker is running
+    conn.execute("ALTER TABLE schedule_jobs ADD COLUMN worker_pid INTEGER")
+    # Outcome of the notifications sent after the job: sending, sent or failed, with the notifier's summary
+    conn.execute("ALTER TABLE schedule_jobs ADD COLUMN notify_status TEXT")
+    conn.execute("ALTER TABLE schedule_jobs ADD COLUMN notify_summary TEXT")
+    conn.execute("ALTER TABLE schedule_jobs ADD COLUMN notify_error TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_schedule_jobs_status ON schedule_jobs (status)")
+
+# (version, description, step) in the order they are applied; never edit a released step, append a new one
+MIGRATIONS = [
+    (1, "create base tables", _create_base_tables),
+    (2, "normalize interview_schedule layout", _normalize_schedule_table),
+    (3, "add score data version triggers", _create_data_version),
+    (4, "add hot path indexes", _create_hot_path_indexes),
+    (5, "add pair_scores table", _create_pair_scores),
+    (6, "add resume_jobs table", _create_resume_jobs),
+    (7, "add bulk_import_log table", _create_bulk_import_log),
+    (8, "add parse_cache table", _create_parse_cache),
+    (9, "add Id_Sequence table", _create_id_sequence),
+    (10, "add otp_codes table", _create_otp_codes),
+    (11, "add notification_status table", _create_notification_status),
+    (12, "add schedule_jobs table", _create_schedule_jobs),
+    (13, "add schedule_jobs.daily_capacity", _add_schedule_job_capacity),
+    (14, "add schedule_jobs worker and notification columns", _add_schedule_job_ownership),
+]
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate():
+    """Applies every pending migration, each in its own transaction, and returns the schema version."""
+    conn = db.get_connection()
+    for version, description, step in MIGRATIONS:
+        # IMMEDIATE so concurrent workers starting up apply each step only once
+        with db.transaction(immediate=True):
+            if current_version(conn) >= version:
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        print(f"✅ Applied migration {version}: {description}")
+    return current_version(conn)
+
+def hot_queries():
+    """
+    Queries on request paths as {name: (query, sample params, table aliases allowed to scan in full)}.
+    Each is the constant its owner actually runs. The owners are imported here rather than at module
+    level, so applying migrations does not load the scoring and parsing stacks.
+    """
+    from dataload import DataLoader
+    from notifications import ScheduleNotifier
+    from otp_store import SqliteOtpStore
+    from pair_scores import PairScoreStore
+    from parse_cache import ParseCache
+    from password import RESERVE_CANDIDATE_IDS_QUERY
+    from resume_jobs import ResumeJobQueue
+    from schedule_jobs import ScheduleJobRunner
+    return {
+        "validate_candidate": (DataLoader.VALIDATE_INTERVIEWEE_QUERY, ("",), set()),
+        "validate_expert": (DataLoader.VALIDATE_INTERVIEWER_QUERY, ("",), set()),
+        "expert_schedule": (DataLoader.EXPERT_SCHEDULE_QUERY, ("",), set()),
+        "candidate_schedule": (DataLoader.CANDIDATE_SCHEDULE_QUERY, ("",), set()),
+        "data_version": (DataLoader.DATA_VERSION_QUERY, (), set()),
+        "scores_for_interviewee": (PairScoreStore.INTERVIEWEE_SCORES_QUERY, ("",), set()),
+        "scores_for_interviewer": (PairScoreStore.INTERVIEWER_SCORES_QUERY, ("", 10), set()),
+        "scheduled_scores_for_interviewer": (PairScoreStore.SCHEDULED_SCORES_FOR_INTERVIEWER_QUERY, ("",), set()),
+        "resume_job_status": (ResumeJobQueue.STATUS_QUERY, ("",), set()),
+        "parse_cache_lookup": (ParseCache.LOOKUP_QUERY, ("",), set()),
+        "reserve_candidate_ids": (RESERVE_CANDIDATE_IDS_QUERY, (1,), set()),
+        "otp_lookup": (SqliteOtpStore.LOOKUP_QUERY, ("",), set()),
+        "schedule_job_status": (ScheduleJobRunner.STATUS_QUERY, ("",), set()),
+        "notifications_sent": (ScheduleNotifier.DELIVERED_QUERY, (), set()),
+        # Bulk loaders necessarily read their driving table; everything they join must use an index
+        "load_interviewees": (DataLoader.INTERVIEWEES_QUERY, (), {"i"}),
+        "load_interviewers": (DataLoader.INTERVIEWERS_QUERY, (), {"i"}),
+    }
+
+def find_full_scans(conn=None, queries=None):
+    """Returns {query_name: [plan detail, ...]} for hot queries that scan a table without an index."""
+    conn = conn or db.get_connection()
+    violations = {}
+    for name, (query, params, allowed_scans) in (queries or hot_queries()).items():
+        for _, _, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall():
+            match = re.match(r"SCAN (\w+)(?: AS (\w+))?$", detail)
+            if match and (match.group(2) or match.group(1)) not in allowed_scans:
+                violations.setdefault(name, []).append(detail)
+    return violations
+
+if __name__ == '__main__':
+    # python migrations.py [--check-plans]: migrate, then optionally fail on full table scans
+    print(f"✅ Schema at version {migrate()}")
+    if "--check-plans" in sys.argv:
+        queries = hot_queries()
+        violations = find_full_scans(queries=queries)
+        for name, details in violations.items():
+            print(f"❌ {name}: {'; '.join(details)}")
+        if violations:
+            sys.exit(1)
+        print(f"✅ No full table scans in {len(queries)} hot queries.")
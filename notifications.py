@@ -0,0 +1,140 @@
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import db
+import password
+
+class RateLimiter:
+    """Spaces acquire() calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+class ScheduleNotifier:
+    """
+    SMS notifications for the stored interview schedule. Recipients sharing a message are sent
+    as comma-separated batches of up to BATCH_SIZE numbers per bulkV2 call, batches go out
+    concurrently under a rate limit with per-batch retries, and each recipient's outcome is
+    recorded in notification_status so a rerun only sends what has not been delivered yet.
+    """
+    BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", 100))
+    BATCHES_PER_SECOND = float(os.getenv("SMS_BATCHES_PER_SECOND", 5))
+    WORKERS = int(os.getenv("SMS_BATCH_WORKERS", 4))
+    MAX_ATTEMPTS = 3
+    RETRY_BACKOFF = 1.0
+    RECIPIENTS_QUERY = """
+        SELECT s.Interviewee_ID, ie.phone, s.Interviewer_ID, ir.phone, s.date, s.time
+        FROM interview_schedule s
+        LEFT JOIN Interviewee ie ON s.Interviewee_ID = ie.interviewee_id
+        LEFT JOIN Interviewer ir ON s.Interviewer_ID = ir.interviewer_id
+    """
+    DELIVERED_QUERY = "SELECT recipient_id, message FROM notification_status WHERE status = 'sent'"
+    _run_lock = threading.Lock()
+
+    @staticmethod
+    def build_notifications(conn):
+        """
+        Returns [(recipient_id, phone, message)]: one per interviewee for their slot, and one per
+        interviewer and interview day. Messages carry no names, so everyone sharing a slot or day
+        gets the same text and can be batched.
+        """
+        notifications = {}
+        for interviewee_id, interviewee_phone, interviewer_id, interviewer_phone, date, slot in conn.execute(ScheduleNotifier.RECIPIENTS_QUERY):
+            notifications[(interviewee_id, f"Your DRDO interview is scheduled on {date} at {slot}. Please check your dashboard for details.")] = interviewee_phone
+            notifications[(interviewer_id, f"You have DRDO interviews scheduled on {date}. Please check your dashboard for the schedule.")] = interviewer_phone
+        return [(recipient_id, phone, message) for (recipient_id, message), phone in notifications.items()]
+
+    @staticmethod
+    def _record(rows):
+        """rows: [(status, attempts, error, recipient_id, message)]"""
+        with db.transaction() as conn:
+            conn.executemany("""
+                UPDATE notification_status
+                SET status = ?, attempts = attempts + ?, error = ?, updated_at = ?
+                WHERE recipient_id = ? AND message = ?
+            """, [(status, attempts, error, time.time(), recipient_id, message)
+                  for status, attempts, error, recipient_id, message in rows])
+
+    @staticmethod
+    def _send_batch(message, phones, limiter):
+        """Sends one batch, retrying with exponential backoff; returns (attempts, response)."""
+        for attempt in range(1, ScheduleNotifier.MAX_ATTEMPTS + 1):
+            limiter.acquire()
+            response = password.send_sms(",".join(phones), message)
+            if response["return"]:
+                break
+            if attempt < ScheduleNotifier.MAX_ATTEMPTS:
+                time.sleep(ScheduleNotifier.RETRY_BACKOFF * 2 ** (attempt - 1))
+        return attempt, response
+
+    @staticmethod
+    def notify_schedule():
+        """Sends every not yet delivered schedule notification and returns a summary of the outcomes."""
+        with ScheduleNotifier._run_lock:
+            with db.transaction() as conn:
+                notifications = ScheduleNotifier.build_notifications(conn)
+                conn.executemany("""
+                    INSERT OR IGNORE INTO notification_status (recipient_id, message, phone, status, attempts, updated_at)
+                    VALUES (?, ?, ?, 'pending', 0, ?)
+                """, [(recipient_id, message, phone, time.time()) for recipient_id, phone, message in notifications])
+                delivered = set(conn.execute(ScheduleNotifier.DELIVERED_QUERY).fetchall())
+
+            summary = {"sent": 0, "failed": 0, "invalid": 0, "already_sent": 0, "batches": 0}
+            # message -> phone -> recipients with that number
+            groups, invalid = {}, []
+            for recipient_id, phone, message in notifications:
+                if (recipient_id, message) in delivered:
+                    summary["already_sent"] += 1
+                elif not phone or not re.fullmatch(r'\d{10}', str(phone)):
+                    invalid.append(("invalid", 0, f"Invalid phone number: {phone}", recipient_id, message))
+                else:
+                    groups.setdefault(message, {}).setdefault(str(phone), []).append(recipient_id)
+            if invalid:
+                ScheduleNotifier._record(invalid)
+                summary["invalid"] = len(invalid)
+
+            batches = []
+            for message, phones in groups.items():
+                numbers = list(phones)
+                for start in range(0, len(numbers), ScheduleNotifier.BATCH_SIZE):
+                    batch = numbers[start:start + ScheduleNotifier.BATCH_SIZE]
+                    batches.append((message, batch, [recipient for number in batch for recipient in phones[number]]))
+            summary["batches"] = len(batches)
+            print(f"📤 Sending {sum(len(batch[2]) for batch in batches)} notifications in {len(batches)} batches.")
+
+            limiter = RateLimiter(ScheduleNotifier.BATCHES_PER_SECOND)
+            with ThreadPoolExecutor(max_workers=ScheduleNotifier.WORKERS, thread_name_prefix="notify") as executor:
+                futures = {executor.submit(ScheduleNotifier._send_batch, message, numbers, limiter): (message, recipients)
+                           for message, numbers, recipients in batches}
+                for future in as_completed(futures):
+                    message, recipients = futures[future]
+                    try:
+                        attempts, response = future.result()
+                    except Exception as e:
+                        attempts, response = ScheduleNotifier.MAX_ATTEMPTS, {"return": False, "message": str(e)}
+                    status = "sent" if response["return"] else "failed"
+                    error = None if response["return"] else response.get("message")
+                    ScheduleNotifier._record([(status, attempts, error, recipient_id, message) for recipient_id in recipients])
+                    summary[status] += len(recipients)
+
+            print(f"✅ Notifications: {summary['sent']} sent, {summary['failed']} failed, "
+                  f"{summary['invalid']} invalid numbers, {summary['already_sent']} already sent.")
+            return summary
+
+if __name__ == '__main__':
+    # python notifications.py; rerun to retry whatever was not delivered
+    summary = ScheduleNotifier.notify_schedule()
+    sys.exit(1 if summary["failed"] else 0)
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+import db
+
+# verify() outcomes
+OTP_OK = "ok"
+OTP_NOT_FOUND = "not_found"
+OTP_EXPIRED = "expired"
+OTP_INVALID = "invalid"
+OTP_TOO_MANY_ATTEMPTS = "too_many_attempts"
+
+class MemoryOtpStore:
+    """OTPs in a per-process dict keyed by phone number; only suitable for a single worker."""
+
+    def __init__(self, ttl, max_attempts):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def put(self, phone_number, otp):
+        with self._lock:
+            self._codes[phone_number] = {"otp": int(otp), "expires_at": time.time() + self.ttl, "attempts": 0}
+
+    def verify(self, phone_number, otp):
+        with self._lock:
+            entry = self._codes.get(phone_number)
+            if entry is None:
+                return OTP_NOT_FOUND
+            if time.time() > entry["expires_at"]:
+                del self._codes[phone_number]
+                return OTP_EXPIRED
+            if int(otp) == entry["otp"]:
+                del self._codes[phone_number]
+                return OTP_OK
+            entry["attempts"] += 1
+            if entry["attempts"] >= self.max_attempts:
+                del self._codes[phone_number]
+                return OTP_TOO_MANY_ATTEMPTS
+            return OTP_INVALID
+
+    def sweep(self):
+        """Drops expired OTPs and returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [phone for phone, entry in self._codes.items() if entry["expires_at"] < now]
+            for phone in expired:
+                del self._codes[phone]
+        return len(expired)
+
+class SqliteOtpStore:
+    """OTPs in the shared otp_codes table, so /login and /verify_otp may land on different workers."""
+    LOOKUP_QUERY = "SELECT otp, expires_at, attempts FROM otp_codes WHERE phone_number = ?"
+
+    def __init__(self, ttl, max_attempts):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+    def put(self, phone_number, otp):
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO otp_codes (phone_number, otp, expires_at, attempts)
+                VALUES (?, ?, ?, 0)
+            """, (phone_number, int(otp), time.time() + self.ttl))
+
+    def verify(self, phone_number, otp):
+        # IMMEDIATE so two workers checking the same phone cannot both consume an attempt or the code
+        with db.transaction(immediate=True) as conn:
+            row = conn.execute(SqliteOtpStore.LOOKUP_QUERY, (phone_number,)).fetchone()
+            if row is None:
+                return OTP_NOT_FOUND
+            stored_otp, expires_at, attempts = row
+            if time.time() > expires_at:
+                conn.execute("DELETE FROM otp_codes WHERE phone_number = ?", (phone_number,))
+                return OTP_EXPIRED
+            if int(otp) == stored_otp:
+                conn.execute("DELETE FROM otp_codes WHERE phone_number = ?", (phone_number,))
+                return OTP_OK
+            if attempts + 1 >= self.max_attempts:
+                conn.execute("DELETE FROM otp_codes WHERE phone_number = ?", (phone_number,))
+                return OTP_TOO_MANY_ATTEMPTS
+            conn.execute("UPDATE otp_codes SET attempts = attempts + 1 WHERE phone_number = ?", (phone_number,))
+            return OTP_INVALID
+
+    def sweep(self):
+        """Deletes expired OTPs and returns how many were removed."""
+        with db.transaction() as conn:
+            return conn.execute("DELETE FROM otp_codes WHERE expires_at < ?", (time.time(),)).rowcount
+
+class OtpStore:
+    """
+    Selects the OTP backend from OTP_BACKEND ("sqlite" by default, or "memory") and runs a
+    background sweeper that deletes expired codes every SWEEP_INTERVAL seconds.
+    """
+    BACKENDS = {"memory": MemoryOtpStore, "sqlite": SqliteOtpStore}
+    BACKEND = os.getenv("OTP_BACKEND", "sqlite")
+    TTL = int(os.getenv("OTP_TTL_SECONDS", 300))
+    MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+    SWEEP_INTERVAL = 60
+    _store = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get():
+        """Returns this process's OTP store, creating it and starting its sweeper on first use."""
+        with OtpStore._lock:
+            if OtpStore._store is None:
+                if OtpStore.BACKEND not in OtpStore.BACKENDS:
+                    raise ValueError(f"Unknown OTP_BACKEND '{OtpStore.BACKEND}', expected one of {sorted(OtpStore.BACKENDS)}")
+                OtpStore._store = OtpStore.BACKENDS[OtpStore.BACKEND](OtpStore.TTL, OtpStore.MAX_ATTEMPTS)
+                threading.Thread(target=OtpStore._sweep_forever, args=(OtpStore._store,), name="otp-sweeper", daemon=True).start()
+                print(f"✅ Using {OtpStore.BACKEND} OTP store (TTL {OtpStore.TTL}s, {OtpStore.MAX_ATTEMPTS} attempts).")
+            return OtpStore._store
+
+    @staticmethod
+    def _sweep_forever(store):
+        while True:
+            time.sleep(OtpStore.SWEEP_INTERVAL)
+            try:
+                removed = store.sweep()
+                if removed:
+                    print(f"🧹 Swept {removed} expired OTPs.")
+            except Exception as e:
+                print(f"❌ Error sweeping OTPs: {e}")
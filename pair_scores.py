@@ -0,0 +1,197 @@
+import sqlite3
+import sys
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+import db
+from dataload import DataLoader
+from cossimilarity import SimilarityCalculator
+from matching import MatchingService
+from score_cache import ScoreCache
+from tfidf_model import TfidfModel
+
+class PairScoreStore:
+    """
+    Materialized cosine, Jaccard, matching and regression scores per (interviewee, interviewer) pair.
+    A batch refresh (`python pair_scores.py`, and every schedule job once its schedule is stored)
+    fills the indexed pair_scores table; dashboards only read it, possibly stale, with indexed lookups.
+    """
+    # Data_Version row recording the score data version pair_scores was last refreshed at
+    VERSION_NAME = 'pair_scores'
+    COLUMNS = ("interviewee_id", "interviewer_id", "cosine", "jaccard", "matching", "regression")
+    # Best interviewers kept per interviewee by cosine and by matching score, besides the scheduled one
+    TOP_K = 5
+    SCHEDULED_PAIRS_QUERY = "SELECT Interviewee_ID, Interviewer_ID FROM interview_schedule"
+    INTERVIEWEE_SCORES_QUERY = """
+        SELECT interviewee_id, interviewer_id, cosine, jaccard, matching, regression
+        FROM pair_scores WHERE interviewee_id = ?
+        ORDER BY regression DESC
+    """
+    # LIMIT -1 returns every row
+    INTERVIEWER_SCORES_QUERY = """
+        SELECT interviewee_id, interviewer_id, cosine, jaccard, matching, regression
+        FROM pair_scores WHERE interviewer_id = ?
+        ORDER BY regression DESC
+        LIMIT ?
+    """
+
+    # Scores of the interviewer's booked interviews only; CROSS JOIN keeps SQLite driving from the
+    # bookings and looking each pair up by primary key, instead of walking all the interviewer's pairs
+    SCHEDULED_SCORES_FOR_INTERVIEWER_QUERY = """
+        SELECT p.interviewee_id, p.interviewer_id, p.cosine, p.jaccard, p.matching, p.regression
+        FROM interview_schedule s
+        CROSS JOIN pair_scores p ON p.interviewee_id = s.Interviewee_ID AND p.interviewer_id = s.Interviewer_ID
+        WHERE s.Interviewer_ID = ?
+    """
+
+    @staticmethod
+    def compute_top_pairs(snapshot, model):
+        """
+        Returns {(interviewee_id, interviewer_id): (cosine, matching)} for the TOP_K best interviewers of
+        every interviewee by cosine and by matching score, scoring both in one blocked pass.
+        """
+        interviewees_df = snapshot.interviewees
+        interviewers_df = snapshot.interviewers
+        interviewee_vectors = model["vectorizer"].transform(interviewees_df["core_field"].fillna('').astype(str).tolist())
+        inputs = MatchingService.encode_inputs(interviewees_df, interviewers_df, snapshot.skills)
+        invalid = ~DataLoader.valid_interviewer_mask(interviewers_df)
+        interviewee_ids = interviewees_df["user_id"].to_numpy()
+        interviewer_ids = interviewers_df["interviewer_id"].to_numpy()
+
+        top_pairs = {}
+        for start in range(0, len(interviewees_df), SimilarityCalculator.BLOCK_SIZE):
+            cosine = cosine_similarity(interviewee_vectors[start:start + SimilarityCalculator.BLOCK_SIZE], model["interviewer_matrix"])
+            matching = MatchingService.score_block(inputs, slice(start, start + SimilarityCalculator.BLOCK_SIZE))
+            cosine[:, invalid] = 0
+            matching[:, invalid] = 0
+            picked = np.zeros(cosine.shape, dtype=bool)
+            for scores in (cosine, matching):
+                rows, cols, _ = SimilarityCalculator.select_matches(scores, PairScoreStore.TOP_K)
+                picked[rows, cols] = True
+            rows, cols = np.nonzero(picked)
+            top_pairs.update(zip(zip(interviewee_ids[rows + start], interviewer_ids[cols]),
+                                 zip(cosine[rows, cols].tolist(), matching[rows, cols].tolist())))
+        print(f"✅ Computed {len(top_pairs)} top pair scores.")
+        return top_pairs
+
+    @staticmethod
+    def score_pairs(snapshot, model, pairs):
+        """Returns {(interviewee_id, interviewer_id): (cosine, matching)} for the given pairs of snapshot IDs."""
+        interviewee_rows = {interviewee_id: row for row, interviewee_id in enumerate(snapshot.interviewees["user_id"])}
+        interviewer_cols = {interviewer_id: col for col, interviewer_id in enumerate(snapshot.interviewers["interviewer_id"])}
+        pairs = [pair for pair in pairs if pair[0] in interviewee_rows and pair[1] in interviewer_cols]
+        if not pairs:
+            return {}
+        rows = np.array([interviewee_rows[interviewee_id] for interviewee_id, _ in pairs])
+        cols = np.array([interviewer_cols[interviewer_id] for _, interviewer_id in pairs])
+
+        # TF-IDF rows are L2-normalized, so the row-wise dot product is the cosine similarity
+        fields = snapshot.interviewees["core_field"].fillna('').astype(str).to_numpy()[rows].tolist()
+        interviewee_vectors = model["vectorizer"].transform(fields)
+        cosine = np.asarray(interviewee_vectors.multiply(model["interviewer_matrix"][cols]).sum(axis=1)).ravel()
+        inputs = MatchingService.encode_inputs(snapshot.interviewees, snapshot.interviewers, snapshot.skills)
+        matching = MatchingService.score_pairs(inputs, rows, cols)
+        return dict(zip(pairs, zip(cosine.tolist(), matching.tolist())))
+
+    @staticmethod
+    def scheduled_pairs():
+        try:
+            with db.get_connection() as conn:
+                return [tuple(row) for row in conn.execute(PairScoreStore.SCHEDULED_PAIRS_QUERY).fetchall()]
+        except sqlite3.Error as e:
+            print(f"❌ Error loading scheduled pairs: {e}")
+            return []
+
+    @staticmethod
+    def refresh(snapshot=None):
+        """
+        Replaces pair_scores in one transaction with the TOP_K best pairs of every interviewee by cosine
+        and by matching score plus every scheduled pair, whichever mode picked it.
+        """
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        version = snapshot.data_version
+        scores = {}
+        if not (snapshot.interviewees.empty or snapshot.interviewers.empty):
+            tfidf = TfidfModel.get(snapshot)
+            # The N x M pass reruns only when the data or the TF-IDF model changed; refreshing after a
+            # reschedule only scores the scheduled pairs outside the top pairs
+            cache_version = None if version is None else (version, tfidf["fitted_at"])
+            scores.update(ScoreCache.get_or_compute(
+                "top_pairs", lambda: PairScoreStore.compute_top_pairs(snapshot, tfidf), cache_version))
+            scheduled = [pair for pair in PairScoreStore.scheduled_pairs() if pair not in scores]
+            scores.update(PairScoreStore.score_pairs(snapshot, tfidf, scheduled))
+        cosine_scores = {pair: cosine for pair, (cosine, _) in scores.items()}
+        matching_scores = {pair: matching for pair, (_, matching) in scores.items()}
+        # Only non-zero Jaccard pairs; everything else scores 0
+        jaccard_scores = SimilarityCalculator.compute_jaccard_similarity(snapshot, threshold=0.0)
+        model = MatchingService.fit_regression(cosine_scores, jaccard_scores, matching_scores)
+
+        pairs = list(scores)
+        features = [[float(cosine_scores[pair]), float(jaccard_scores.get(pair, 0)), float(matching_scores[pair])]
+                    for pair in pairs]
+        predictions = model.predict(features).tolist() if model is not None and features else [None] * len(pairs)
+        rows = [(pair[0], pair[1], *feature, prediction) for pair, feature, prediction in zip(pairs, features, predictions)]
+
+        with db.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM pair_scores")
+            conn.executemany("""
+                INSERT OR REPLACE INTO pair_scores
+                    (interviewee_id, interviewer_id, cosine, jaccard, matching, regression)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.execute("INSERT OR REPLACE INTO Data_Version (name, version) VALUES (?, ?)",
+                         (PairScoreStore.VERSION_NAME, version))
+        print(f"✅ Refreshed {len(rows)} pair scores at data version {version}.")
+        return len(rows)
+
+    @staticmethod
+    def add_candidate(interviewee_id, core_field):
+        """
+        Scores a newly stored candidate against the cached interviewer TF-IDF matrix and records the
+        best pair's cosine score; the next refresh fills in the other scores. Returns the best match or None.
+        """
+        best_match = TfidfModel.score_candidate(core_field)
+        if best_match is None:
+            return None
+        interviewer_id, cosine = best_match
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT OR IGNORE INTO pair_scores (interviewee_id, interviewer_id, cosine)
+                VALUES (?, ?, ?)
+            """, (interviewee_id, interviewer_id, float(cosine)))
+        return best_match
+
+    @staticmethod
+    def is_stale():
+        conn = db.get_connection()
+        versions = dict(conn.execute(
+            "SELECT name, version FROM Data_Version WHERE name IN ('scores', ?)", (PairScoreStore.VERSION_NAME,)
+        ).fetchall())
+        return versions.get('scores') != versions.get(PairScoreStore.VERSION_NAME)
+
+    @staticmethod
+    def _rows(query, params):
+        with db.get_connection() as conn:
+            return [dict(zip(PairScoreStore.COLUMNS, row)) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def scores_for_interviewee(interviewee_id):
+        """Returns the interviewee's scored pairs, best regression score first."""
+        return PairScoreStore._rows(PairScoreStore.INTERVIEWEE_SCORES_QUERY, (interviewee_id,))
+
+    @staticmethod
+    def scores_for_interviewer(interviewer_id, top_k=None):
+        """Returns the interviewer's scored pairs, best regression score first, at most top_k of them."""
+        return PairScoreStore._rows(PairScoreStore.INTERVIEWER_SCORES_QUERY, (interviewer_id, -1 if top_k is None else top_k))
+
+    @staticmethod
+    def scheduled_scores_for_interviewer(interviewer_id):
+        """Returns the interviewer's scored pairs that are in the stored schedule."""
+        return PairScoreStore._rows(PairScoreStore.SCHEDULED_SCORES_FOR_INTERVIEWER_QUERY, (interviewer_id,))
+
+if __name__ == '__main__':
+    # Batch job, e.g. from cron: python pair_scores.py [--force]; skips the refresh while the scores are current
+    if "--force" in sys.argv or PairScoreStore.is_stale():
+        PairScoreStore.refresh()
+    else:
+        print("✅ Pair scores are current.")
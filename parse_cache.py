@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import db
+
+class ParseCache:
+    """
+    Parsed resume fields keyed by the SHA-256 of the uploaded file, so re-uploads of the same PDF
+    skip text extraction and pyresparser. Entries live in the parse_cache table and the least
+    recently used ones are evicted once their total size exceeds MAX_BYTES.
+    """
+    MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    CHUNK_SIZE = 64 * 1024
+    LOOKUP_QUERY = "SELECT parsed FROM parse_cache WHERE sha256 = ?"
+    _stats = {"hits": 0, "misses": 0}
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def hash_upload(stream):
+        """Returns the SHA-256 hex digest of a spooled upload, read chunk by chunk, and rewinds it."""
+        digest = hashlib.sha256()
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(ParseCache.CHUNK_SIZE), b""):
+            digest.update(chunk)
+        stream.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def get(sha256):
+        """Returns the cached parse result for the content hash, or None, and counts the hit or miss."""
+        try:
+            with db.transaction() as conn:
+                row = conn.execute(ParseCache.LOOKUP_QUERY, (sha256,)).fetchone()
+                if row:
+                    conn.execute("UPDATE parse_cache SET last_used_at = ? WHERE sha256 = ?", (time.time(), sha256))
+        except Exception as e:
+            print(f"❌ Error reading parse cache: {e}")
+            row = None
+        with ParseCache._stats_lock:
+            ParseCache._stats["hits" if row else "misses"] += 1
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def put(sha256, parsed_data):
+        """Stores a parse result under its content hash, then evicts least recently used entries over MAX_BYTES."""
+        try:
+            parsed = json.dumps(parsed_data, default=str)
+            now = time.time()
+            with db.transaction(immediate=True) as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO parse_cache (sha256, parsed, size, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (sha256, parsed, len(parsed), now, now))
+                conn.execute("""
+                    DELETE FROM parse_cache WHERE sha256 IN (
+                        SELECT sha256 FROM (
+                            SELECT sha256, SUM(size) OVER (ORDER BY last_used_at DESC, sha256) AS running
+                            FROM parse_cache
+                        ) WHERE running > ?
+                    )
+                """, (ParseCache.MAX_BYTES,))
+        except Exception as e:
+            print(f"❌ Error writing parse cache: {e}")
+
+    @staticmethod
+    def stats():
+        """Hit and miss counts for this process, the hit rate, and the cache's current size."""
+        with ParseCache._stats_lock:
+            stats = dict(ParseCache._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        with db.get_connection() as conn:
+            stats["entries"], stats["bytes"] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache").fetchone()
+        return stats
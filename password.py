@@ -1,14 +1,13 @@
 import os
 import random
 import sqlite3
-import requests
+import db
+from concurrent.futures import Future
 from dotenv import load_dotenv
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from sms_dispatcher import SmsDispatcher
 # Load environment variables from .env file
 load_dotenv(r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\.env")
 
-DB_PATH = r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Backend\DRDO_Normalized_Updated_Names.db"
 FAST2SMS_API_KEY = os.getenv("FAST2SMS_API_KEY")
 print(f"DEBUG: Loaded FAST2SMS_API_KEY = {FAST2SMS_API_KEY if FAST2SMS_API_KEY else 'Not Found'}")
 
@@ -16,56 +15,33 @@ def generate_otp():
     return random.randint(100000, 999999)
 
 def send_sms(phone_number, message):
+    """Sends an SMS and waits for the provider's answer."""
     if not FAST2SMS_API_KEY:
         print("❌ FAST2SMS_API_KEY not set in environment variables.")
         return {"return": False, "message": "SMS service configuration error: API key missing"}
+    return SmsDispatcher.send(phone_number, message, FAST2SMS_API_KEY)
 
-    url = "https://www.fast2sms.com/dev/bulkV2"
-    payload = {
-        "message": message,
-        "language": "english",
-        "route": "q",
-        "numbers": phone_number,
-    }
-    headers = {
-        "authorization": FAST2SMS_API_KEY,
-        "Content-Type": "application/x-www-form-urlencoded"
-    }
-
-    # Configure retries with backoff
-    session = requests.Session()
-    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    session.mount("https://", HTTPAdapter(max_retries=retries))
-
-    print(f"📤 Sending SMS to {phone_number} with message: {message}")
-    try:
-        response = session.post(url, data=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        response_data = response.json()
-        print(f"✅ SMS API Response: {response_data}")
-
-        if isinstance(response_data, dict) and response_data.get("return", False):
-            return {"return": True, "message": "SMS sent successfully"}
-        else:
-            error_msg = response_data.get("message", "Unknown API error") if isinstance(response_data, dict) else "Invalid response format"
-            print(f"❌ API returned error: {error_msg}")
-            return {"return": False, "message": error_msg}
+def dispatch_sms(phone_number, message):
+    """Queues an SMS on the background dispatcher and returns a Future resolving to send_sms's result."""
+    if not FAST2SMS_API_KEY:
+        print("❌ FAST2SMS_API_KEY not set in environment variables.")
+        failed = Future()
+        failed.set_result({"return": False, "message": "SMS service configuration error: API key missing"})
+        return failed
+    return SmsDispatcher.dispatch(phone_number, message, FAST2SMS_API_KEY)
 
-    except requests.exceptions.HTTPError as e:
-        error_text = e.response.text if hasattr(e, 'response') and hasattr(e.response, 'text') else str(e)
-        print(f"❌ HTTP Error: {error_text}")
-        return {"return": False, "message": f"HTTP error: {error_text}"}
-    except requests.exceptions.Timeout:
-        print("❌ Request timed out")
-        return {"return": False, "message": "SMS service timed out"}
-    except requests.exceptions.ConnectionError as e:
-        print(f"❌ Connection Error: {e}")
-        return {"return": False, "message": "Failed to connect to SMS service: Network or DNS issue"}
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request Error: {e}")
-        return {"return": False, "message": f"Request error: {str(e)}"}
+def _log_otp_delivery(phone_number, handle):
+    response = handle.result()
+    if response["return"]:
+        print(f"✅ OTP delivered to {phone_number}")
+    else:
+        print(f"❌ Failed to send OTP to {phone_number}: {response['message']}")
 
 def send_otp(phone_number, role):
+    """
+    Generates an OTP and queues its SMS without waiting for delivery. Returns {"return": True,
+    "otp": ..., "delivery": Future} or, when the SMS cannot be queued, the error response.
+    """
     # Validate phone number format (10 digits)
     if not phone_number or not phone_number.isdigit() or len(phone_number) != 10:
         print(f"❌ Invalid phone number: {phone_number}")
@@ -73,26 +49,35 @@ def send_otp(phone_number, role):
 
     otp = generate_otp()
     message = f"Your OTP for {role} login is {otp}. Valid for 5 minutes."
-    response = send_sms(phone_number, message)
+    handle = dispatch_sms(phone_number, message)
 
-    if response["return"]:
-        print(f"✅ OTP {otp} generated and sent to {phone_number}")
-        return {"return": True, "otp": otp}
-    else:
-        print(f"❌ Failed to send OTP to {phone_number}: {response['message']}")
-        return response  # Propagate the error without fallback
+    # Configuration errors fail before anything is queued; report those to the caller directly
+    if handle.done() and not handle.result()["return"]:
+        print(f"❌ Failed to send OTP to {phone_number}: {handle.result()['message']}")
+        return handle.result()  # Propagate the error without fallback
+    handle.add_done_callback(lambda done: _log_otp_delivery(phone_number, done))
+    print(f"✅ OTP {otp} generated and queued for {phone_number}")
+    return {"return": True, "otp": otp, "delivery": handle}
+
+RESERVE_CANDIDATE_IDS_QUERY = "UPDATE Id_Sequence SET next_value = next_value + ? WHERE name = 'candidate'"
+
+def reserve_candidate_ids(count):
+    """
+    Atomically reserves count consecutive candidate IDs from Id_Sequence and returns them.
+    Inside an open transaction (e.g. a bulk insert) the reservation joins it; otherwise it
+    runs in its own IMMEDIATE transaction, so concurrent callers never get the same number.
+    """
+    with db.transaction(immediate=True) as conn:
+        conn.execute(RESERVE_CANDIDATE_IDS_QUERY, (count,))
+        next_value = conn.execute("SELECT next_value FROM Id_Sequence WHERE name = 'candidate'").fetchone()[0]
+    return [f"CAND{number:04d}" for number in range(next_value - count, next_value)]
 
 def generate_candidate_id():
-    with sqlite3.connect(DB_PATH, timeout=10) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM Interviewee")
-        count = cursor.fetchone()[0]
-        candidate_id = f"CAND{count + 1:04d}"
-    return candidate_id
+    return reserve_candidate_ids(1)[0]
 
 def store_candidate_data(candidate_id, name, email, phone, age, experience, gate_score, core_field):
     try:
-        with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        with db.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO Interviewee (interviewee_id, name, email, phone)
@@ -0,0 +1,140 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import db
+from parse_cache import ParseCache
+from resume_store import ResumeStore
+from resume_parser import NlpWorker, ResumeParserService
+from password import generate_candidate_id, store_candidate_data
+from pair_scores import PairScoreStore
+
+def _parse_in_worker(job_id, resume_bytes, db_path, sha256=None):
+    """Pool entry point: marks the job as parsing, caches the parse under the upload's hash and returns it."""
+    if db.DB_PATH != db_path:
+        db.set_db_path(db_path)
+    ResumeJobQueue.update(job_id, "parsing")
+    parsed_data = ResumeParserService.parse_resume(io.BytesIO(resume_bytes))
+    # Without extracted text the GATE score defaults to 0; don't let a failed extraction stick
+    if sha256 and parsed_data and parsed_data.get("full_text"):
+        ParseCache.put(sha256, parsed_data)
+    # The raw text is not needed past eligibility; keep it out of the result pickle
+    parsed_data.pop("full_text", None)
+    return parsed_data
+
+class ResumeJobQueue:
+    """
+    Parses uploaded resumes in a process pool so signup requests return straight away.
+    Each upload gets a resume_jobs row that moves queued -> parsing -> done | not_eligible | error;
+    eligibility and the candidate record are settled in the web process once parsing finishes,
+    and only accepted resumes are written to the ResumeStore.
+    """
+    MAX_WORKERS = int(os.getenv("RESUME_WORKERS", min(4, os.cpu_count() or 1)))
+    # Threads settling finished parses (eligibility, resume file, candidate record, pair score)
+    FINISH_WORKERS = 2
+    STATUS_COLUMNS = ("job_id", "status", "candidate_id", "gate_score", "core_field", "message", "created_at", "updated_at")
+    STATUS_QUERY = f"SELECT {', '.join(STATUS_COLUMNS)} FROM resume_jobs WHERE job_id = ?"
+    _executor = None
+    _finisher = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_executor():
+        with ResumeJobQueue._lock:
+            if ResumeJobQueue._executor is None:
+                # The web process is already threaded when the pool starts, so never fork it
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                ResumeJobQueue._executor = ProcessPoolExecutor(
+                    max_workers=ResumeJobQueue.MAX_WORKERS, mp_context=context, initializer=NlpWorker.warm_up)
+            return ResumeJobQueue._executor
+
+    @staticmethod
+    def _get_finisher():
+        with ResumeJobQueue._lock:
+            if ResumeJobQueue._finisher is None:
+                ResumeJobQueue._finisher = ThreadPoolExecutor(
+                    max_workers=ResumeJobQueue.FINISH_WORKERS, thread_name_prefix="resume-finish")
+            return ResumeJobQueue._finisher
+
+    @staticmethod
+    def submit(job_id, resume_bytes, phone_number, sha256=None, parsed_data=None):
+        """
+        Records a queued job for the uploaded resume and hands its bytes to the parser pool, or
+        settles it right away when parsed_data from the parse cache is given.
+        """
+        now = time.time()
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO resume_jobs (job_id, phone, status, created_at, updated_at)
+                VALUES (?, ?, 'queued', ?, ?)
+            """, (job_id, phone_number, now, now))
+        if parsed_data is not None:
+            cached = Future()
+            cached.set_result(parsed_data)
+            ResumeJobQueue._finish(job_id, phone_number, resume_bytes, sha256, cached)
+            return job_id
+        future = ResumeJobQueue._get_executor().submit(_parse_in_worker, job_id, resume_bytes, db.DB_PATH, sha256)
+        # Done callbacks run on the pool's management thread; hand the settling work to the finisher threads
+        future.add_done_callback(lambda done: ResumeJobQueue._get_finisher().submit(
+            ResumeJobQueue._finish, job_id, phone_number, resume_bytes, sha256, done))
+        print(f"✅ Queued resume job {job_id} ({len(resume_bytes)} bytes)")
+        return job_id
+
+    @staticmethod
+    def update(job_id, status, candidate_id=None, gate_score=None, core_field=None, message=None, file_path=None):
+        with db.transaction() as conn:
+            conn.execute("""
+                UPDATE resume_jobs
+                SET status = ?, candidate_id = COALESCE(?, candidate_id), gate_score = COALESCE(?, gate_score),
+                    core_field = COALESCE(?, core_field), message = COALESCE(?, message),
+                    file_path = COALESCE(?, file_path), updated_at = ?
+                WHERE job_id = ?
+            """, (status, candidate_id, gate_score, core_field, message, file_path, time.time(), job_id))
+
+    @staticmethod
+    def _finish(job_id, phone_number, resume_bytes, sha256, future):
+        """Runs on a finisher thread: applies the GATE cut-off and stores eligible candidates and their resumes."""
+        try:
+            parsed_data = future.result()
+            name = parsed_data.get("name", "Candidate")
+            email = parsed_data.get("email", "unknown@example.com")
+            age = parsed_data.get("age", 25)
+            experience = parsed_data.get("experience", 0)
+            gate_score = parsed_data.get("gate_score", 0)
+            core_field = parsed_data.get("core_field", "General")
+            print(f"✅ Extracted data: Name={name}, Email={email}, Gate={gate_score}, Core Field={core_field}")
+
+            if gate_score < ResumeParserService.GATE_CUTOFF:
+                ResumeJobQueue.update(job_id, "not_eligible", gate_score=gate_score, core_field=core_field,
+                                      message=f"Your GATE score does not meet the minimum requirement of {ResumeParserService.GATE_CUTOFF} for DRDO.")
+                return
+
+            file_path = ResumeStore.save(resume_bytes, sha256)
+            candidate_id = generate_candidate_id()
+            store_candidate_data(candidate_id, name, email, phone_number, age, experience, gate_score, core_field)
+            ResumeJobQueue.update(job_id, "done", candidate_id=candidate_id, gate_score=gate_score, core_field=core_field,
+                                  file_path=file_path,
+                                  message=f"Your application has been successfully submitted! Your candidate ID is {candidate_id}. Please note this ID for login.")
+            try:
+                best_match = PairScoreStore.add_candidate(candidate_id, core_field)
+                if best_match:
+                    print(f"✅ Best TF-IDF match for {candidate_id}: {best_match[0]} ({best_match[1]:.2f})")
+            except Exception as e:
+                # The application is already accepted; the next pair score refresh covers this candidate
+                print(f"⚠️ Could not score candidate {candidate_id}: {e}")
+        except Exception as e:
+            print(f"❌ Error processing resume job {job_id}: {e}")
+            try:
+                ResumeJobQueue.update(job_id, "error", message="There was an error processing your resume. Please ensure it's a valid PDF with all required information.")
+            except Exception as update_error:
+                print(f"❌ Error recording failure of resume job {job_id}: {update_error}")
+
+    @staticmethod
+    def status(job_id):
+        """Returns the job's status fields, or None for an unknown job ID."""
+        with db.get_connection() as conn:
+            row = conn.execute(ResumeJobQueue.STATUS_QUERY, (job_id,)).fetchone()
+        return dict(zip(ResumeJobQueue.STATUS_COLUMNS, row)) if row else None
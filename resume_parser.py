@@ -1,21 +1,111 @@
+import io
 import os
-import sqlite3
+import tempfile
+import threading
+import db
 import pdfplumber
 import re
+import spacy
 from pyresparser import ResumeParser
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 
+class NlpWorker:
+    """
+    Keeps pyresparser's spaCy pipelines loaded for the life of a worker process. pyresparser
+    calls spacy.load for every resume; once installed, each model is loaded once and reused.
+    """
+    _models = {}
+    _spacy_load = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(value):
+        """Hashable stand-in for a spacy.load argument: lists, sets and dicts become tuples."""
+        if isinstance(value, dict):
+            return tuple(sorted((key, NlpWorker._freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(NlpWorker._freeze(item) for item in value)
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted(NlpWorker._freeze(item) for item in value))
+        return value
+
+    @staticmethod
+    def _cached_load(name, *args, **kwargs):
+        key = (str(name), NlpWorker._freeze(args), NlpWorker._freeze(kwargs))
+        try:
+            hash(key)
+        except TypeError:
+            # Arguments we cannot key on (e.g. a config object) bypass the cache
+            return NlpWorker._spacy_load(name, *args, **kwargs)
+        with NlpWorker._lock:
+            if key not in NlpWorker._models:
+                NlpWorker._models[key] = NlpWorker._spacy_load(name, *args, **kwargs)
+            return NlpWorker._models[key]
+
+    @staticmethod
+    def install():
+        """Routes spacy.load through the per-process model cache."""
+        with NlpWorker._lock:
+            if NlpWorker._spacy_load is None:
+                NlpWorker._spacy_load = spacy.load
+                spacy.load = NlpWorker._cached_load
+
+    @staticmethod
+    def warm_up():
+        """
+        Worker initializer: installs the model cache and parses a sample resume, so the spaCy
+        models and NLTK corpora are loaded before the first real document arrives.
+        """
+        try:
+            NlpWorker.install()
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                sample_path = ResumeParserService.create_resume_pdf(os.path.join(tmp_dir, "warm_up.pdf"))
+                if sample_path:
+                    ResumeParser(sample_path).get_extracted_data()
+            print(f"✅ NLP worker {os.getpid()} warmed up with {len(NlpWorker._models)} cached models.")
+        except Exception as e:
+            # A cold worker still parses correctly, it just loads the models on first use
+            print(f"⚠️ NLP warm-up failed: {e}")
+
 class ResumeParserService:
-    DB_PATH = r"C:\Users\Sudhindra Prakash\Desktop\java project\.venv\Backend\DRDO_Normalized_Updated_Names.db"
+    # Minimum GATE score for DRDO eligibility
+    GATE_CUTOFF = 1150
+    GATE_PATTERN = re.compile(r'GATE\s+Score\s*(?:\n\s*)?Score\s*[:=]\s*(\d{3,4})', re.IGNORECASE)
+    CORE_FIELDS = {
+        "Aerospace": ["aerospace", "aeronautical", "aviation", "avionics"],
+        "Computer Science": ["computer science", "cs", "cse", "information technology", "it"],
+        "Electronics": ["electronics", "ece", "eee", "electrical", "communication"],
+        "Mechanical": ["mechanical", "mech", "production engineering", "automobile"],
+        "Civil": ["civil engineering", "civil", "structural engineering"],
+        "Chemical": ["chemical", "chem", "petroleum", "petrochemical"],
+        "Biotechnology": ["biotechnology", "biotech", "biomedical", "biochemical"],
+        "Physics": ["physics", "applied physics"],
+        "Mathematics": ["mathematics", "math", "applied mathematics", "statistics"],
+        "Medical": ["medicine", "medical", "mbbs", "md", "surgery"]
+    }
+    KEYWORD_FIELDS = {keyword: field for field, keywords in CORE_FIELDS.items() for keyword in keywords}
+    # All keywords in one alternation, longest first, matched on whole words so "it" and "md" skip "with" and "cmd"
+    CORE_FIELD_PATTERN = re.compile(r'\b(?:' + '|'.join(
+        re.escape(keyword).replace(r'\ ', r'\s+') for keyword in sorted(KEYWORD_FIELDS, key=len, reverse=True)
+    ) + r')\b')
+    _prescreen_stats = {"prescreened": 0, "rejected": 0, "pages_read": 0, "pages_skipped": 0}
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def _rewind(resume):
+        # File paths and file-like resumes are both accepted; file-like ones are read from the start
+        if hasattr(resume, "seek"):
+            resume.seek(0)
+        return resume
 
     @staticmethod
     def extract_text_from_pdf(file_path):
         try:
             all_text = ""
-            with pdfplumber.open(file_path) as pdf:
+            with pdfplumber.open(ResumeParserService._rewind(file_path)) as pdf:
                 for page in pdf.pages:
                     text = page.extract_text() or ""
                     all_text += text + "\n"
@@ -65,52 +155,97 @@ class ResumeParserService:
     @staticmethod
     def extract_gate_score(text):
         try:
-            gate_pattern = r'GATE\s+Score\s*(?:\n\s*)?Score\s*[:=]\s*(\d{3,4})'
-            matches = re.findall(gate_pattern, text, re.IGNORECASE)
+            matches = ResumeParserService.GATE_PATTERN.findall(text)
             print(f"GATE score matches: {matches}")
             return int(matches[0]) if matches else 0
         except Exception as e:
             print(f"❌ Error extracting GATE score: {e}")
             return 0
 
+    @staticmethod
+    def prescreen(resume):
+        """
+        Returns the resume's GATE score (0 if there is none), reading pages only until it shows up, or
+        None if the PDF could not be read. Cheap enough to run before parse_resume, so ineligible
+        resumes never reach spaCy.
+        """
+        text, gate_score, pages_read, total_pages, failed = "", 0, 0, 0, False
+        try:
+            with pdfplumber.open(ResumeParserService._rewind(resume)) as pdf:
+                total_pages = len(pdf.pages)
+                for page in pdf.pages:
+                    # Pages are joined as in extract_text_from_pdf, so the first match is the same
+                    text += (page.extract_text() or "") + "\n"
+                    pages_read += 1
+                    match = ResumeParserService.GATE_PATTERN.search(text)
+                    if match:
+                        gate_score = int(match.group(1))
+                        break
+        except Exception as e:
+            print(f"❌ Error pre-screening PDF: {e}")
+            failed = True
+        with ResumeParserService._stats_lock:
+            stats = ResumeParserService._prescreen_stats
+            stats["prescreened"] += 1
+            stats["rejected"] += not failed and gate_score < ResumeParserService.GATE_CUTOFF
+            stats["pages_read"] += pages_read
+            stats["pages_skipped"] += total_pages - pages_read
+        return None if failed else gate_score
+
+    @staticmethod
+    def prescreen_stats():
+        """Counts of pre-screened and rejected resumes, and of PDF pages read and skipped."""
+        with ResumeParserService._stats_lock:
+            return dict(ResumeParserService._prescreen_stats)
+
+    @staticmethod
+    def _scan_core_fields(text):
+        """One pass of CORE_FIELD_PATTERN: returns ({field: hits}, {field: words in its longest matched keyword})."""
+        hits, specificity = {}, {}
+        for match in ResumeParserService.CORE_FIELD_PATTERN.finditer(text.lower()):
+            keyword = " ".join(match.group().split())
+            field = ResumeParserService.KEYWORD_FIELDS[keyword]
+            hits[field] = hits.get(field, 0) + 1
+            specificity[field] = max(specificity.get(field, 0), len(keyword.split()))
+        return hits, specificity
+
+    @staticmethod
+    def core_field_hits(text):
+        """Returns {field: number of keyword hits} for the fields mentioned in the text."""
+        try:
+            return ResumeParserService._scan_core_fields(text)[0]
+        except Exception as e:
+            print(f"❌ Error counting core field keywords: {e}")
+            return {}
+
     @staticmethod
     def extract_core_field(text):
         try:
-            fields = {
-                "Aerospace": ["aerospace", "aeronautical", "aviation", "avionics"],
-                "Computer Science": ["computer science", "cs", "cse", "information technology", "it"],
-                "Electronics": ["electronics", "ece", "eee", "electrical", "communication"],
-                "Mechanical": ["mechanical", "mech", "production engineering", "automobile"],
-                "Civil": ["civil engineering", "civil", "structural engineering"],
-                "Chemical": ["chemical", "chem", "petroleum", "petrochemical"],
-                "Biotechnology": ["biotechnology", "biotech", "biomedical", "biochemical"],
-                "Physics": ["physics", "applied physics"],
-                "Mathematics": ["mathematics", "math", "applied mathematics", "statistics"],
-                "Medical": ["medicine", "medical", "mbbs", "md", "surgery"]
-            }
-            text_lower = text.lower()
-            print(f"Text for core field extraction: {text_lower}")
-            matched_field = "General Engineering"
-            max_specificity = 0  # Track the longest matching keyword for specificity
-            for field, keywords in fields.items():
-                for keyword in keywords:
-                    if keyword in text_lower:
-                        specificity = len(keyword.split())  # More words = more specific
-                        if specificity > max_specificity:
-                            max_specificity = specificity
-                            matched_field = field
-                            print(f"Matched core field: {field} with keyword: {keyword}")
+            print(f"Text for core field extraction: {text.lower()}")
+            hits, specificity = ResumeParserService._scan_core_fields(text)
+            if not hits:
+                return "General Engineering"
+            # Most specific keyword wins (more words = more specific), then most hits, then taxonomy order
+            order = list(ResumeParserService.CORE_FIELDS)
+            matched_field = max(hits, key=lambda field: (specificity[field], hits[field], -order.index(field)))
+            print(f"Matched core field: {matched_field} with keyword hits: {hits}")
             return matched_field
         except Exception as e:
             print(f"❌ Error extracting core field: {e}")
             return "General Engineering"
 
     @staticmethod
-    def parse_resume(file_path):
+    def parse_resume(resume):
+        """Parses a resume given as a file path or an in-memory file-like object."""
         try:
-            full_text = ResumeParserService.extract_text_from_pdf(file_path)
+            if not isinstance(resume, (str, os.PathLike, io.BytesIO)):
+                resume = io.BytesIO(ResumeParserService._rewind(resume).read())
+            if isinstance(resume, io.BytesIO) and not getattr(resume, "name", None):
+                # pyresparser takes the file type of an in-memory resume from its name
+                resume.name = "resume.pdf"
+            full_text = ResumeParserService.extract_text_from_pdf(resume)
             try:
-                parsed_data = ResumeParser(file_path).get_extracted_data()
+                parsed_data = ResumeParser(ResumeParserService._rewind(resume)).get_extracted_data()
             except Exception as e:
                 print(f"⚠️ pyresparser failed: {e}, using fallback extraction")
                 parsed_data = {}
@@ -127,6 +262,7 @@ class ResumeParserService:
             parsed_data["gate_score"] = gate_score
             if not parsed_data.get("core_field"):
                 parsed_data["core_field"] = ResumeParserService.extract_core_field(full_text)
+            parsed_data["core_field_hits"] = ResumeParserService.core_field_hits(full_text)
             if not parsed_data.get("experience"):
                 parsed_data["experience"] = parsed_data.get("total_experience", 0)
             parsed_data["full_text"] = full_text
@@ -145,7 +281,7 @@ class ResumeParserService:
             experience = parsed_data.get("experience", 0)
             core_field = parsed_data.get("core_field", "Unknown")
 
-            with sqlite3.connect(ResumeParserService.DB_PATH, timeout=10) as conn:
+            with db.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO Interviewee 
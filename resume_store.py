@@ -0,0 +1,65 @@
+import hashlib
+import os
+import threading
+import time
+import db
+
+class ResumeStore:
+    """
+    Accepted resumes on disk, one file per distinct content named by its SHA-256.
+    Files older than RETENTION_DAYS are removed by sweep(), which saves also run at most
+    once per SWEEP_INTERVAL seconds.
+    """
+    STORE_DIR = os.getenv("RESUME_STORE_DIR", os.path.join(os.path.dirname(db.DB_PATH), "resumes"))
+    RETENTION_DAYS = int(os.getenv("RESUME_RETENTION_DAYS", 365))
+    SWEEP_INTERVAL = 3600
+    _last_sweep = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def save(data, sha256=None):
+        """Persists an accepted resume's bytes and returns the stored file's path."""
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        os.makedirs(ResumeStore.STORE_DIR, exist_ok=True)
+        path = os.path.join(ResumeStore.STORE_DIR, f"{sha256}.pdf")
+        if os.path.exists(path):
+            # Same content accepted again: restart its retention period
+            os.utime(path)
+        else:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as out:
+                out.write(data)
+            os.replace(tmp_path, path)
+        ResumeStore.sweep_if_due()
+        return path
+
+    @staticmethod
+    def sweep(now=None):
+        """Deletes stored resumes past the retention period and returns how many were removed."""
+        cutoff = (now or time.time()) - ResumeStore.RETENTION_DAYS * 86400
+        removed = 0
+        try:
+            with os.scandir(ResumeStore.STORE_DIR) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            print(f"❌ Error sweeping resume store: {e}")
+        if removed:
+            print(f"🧹 Removed {removed} resumes older than {ResumeStore.RETENTION_DAYS} days.")
+        return removed
+
+    @staticmethod
+    def sweep_if_due():
+        with ResumeStore._lock:
+            if time.time() - ResumeStore._last_sweep < ResumeStore.SWEEP_INTERVAL:
+                return 0
+            ResumeStore._last_sweep = time.time()
+        return ResumeStore.sweep()
+
+if __name__ == '__main__':
+    # Run from a scheduler (e.g. cron) to enforce retention: python resume_store.py
+    ResumeStore.sweep()
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import db
+from interview_scheduler import InterviewScheduler
+from notifications import ScheduleNotifier
+from pair_scores import PairScoreStore
+
+class ScheduleCancelled(Exception):
+    pass
+
+class ScheduleJobRunner:
+    """
+    Runs schedule computations as background jobs, one at a time, so /compute_schedule returns
+    a job ID straight away. Each job's stage (loading, scoring, assigning, persisting) and
+    counts are kept in schedule_jobs; cancellation is checked at every progress report.
+    Only one job runs across all web processes: a job claims the 'running' status in the
+    database before it starts, and waits while another job holds it.
+    """
+    STATUS_COLUMNS = ("job_id", "status", "mode", "incremental", "daily_capacity", "stage", "done", "total",
+                      "summary", "error", "notify_status", "notify_summary", "notify_error", "created_at", "updated_at")
+    STATUS_QUERY = f"SELECT {', '.join(STATUS_COLUMNS)} FROM schedule_jobs WHERE job_id = ?"
+    CLAIM_QUERY = """
+        UPDATE schedule_jobs SET status = 'running', updated_at = ?
+        WHERE job_id = ? AND status = 'queued'
+        AND NOT EXISTS (SELECT 1 FROM schedule_jobs WHERE status = 'running')
+    """
+    # Seconds between attempts to claim the run while another process's job holds it, and how long to keep trying
+    CLAIM_RETRY = 2
+    CLAIM_TIMEOUT = int(os.getenv("SCHEDULE_JOB_CLAIM_TIMEOUT", 30 * 60))
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_executor():
+        with ScheduleJobRunner._lock:
+            # A single worker per process; the claim in _run serializes jobs queued by other processes
+            if ScheduleJobRunner._executor is None:
+                ScheduleJobRunner._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule")
+            return ScheduleJobRunner._executor
+
+    @staticmethod
+    def submit(mode="greedy", incremental=False, notify=False, daily_capacity=None):
+        """Queues a schedule computation and returns its job ID; daily_capacity limits interviews per expert and day."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO schedule_jobs (job_id, status, mode, incremental, daily_capacity, done, total, cancel_requested,
+                                           worker_pid, created_at, updated_at)
+                VALUES (?, 'queued', ?, ?, ?, 0, 0, 0, ?, ?, ?)
+            """, (job_id, mode, int(incremental), daily_capacity, os.getpid(), now, now))
+        ScheduleJobRunner._get_executor().submit(ScheduleJobRunner._run, job_id, mode, incremental, notify, daily_capacity)
+        print(f"✅ Queued schedule job {job_id} ({mode}{', incremental' if incremental else ''}"
+              f"{f', {daily_capacity} per expert and day' if daily_capacity else ''})")
+        return job_id
+
+    @staticmethod
+    def _update(job_id, **fields):
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with db.transaction() as conn:
+            conn.execute(f"UPDATE schedule_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                         (*fields.values(), time.time(), job_id))
+
+    @staticmethod
+    def _progress(job_id):
+        def report(stage, done, total):
+            with db.get_connection() as conn:
+                cancelled = conn.execute("SELECT cancel_requested FROM schedule_jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+            if cancelled:
+                raise ScheduleCancelled()
+            ScheduleJobRunner._update(job_id, stage=stage, done=done, total=total)
+        return report
+
+    @staticmethod
+    def _claim(job_id):
+        """Marks the job running once no other job is; returns False if it was cancelled or never got the run."""
+        deadline = time.time() + ScheduleJobRunner.CLAIM_TIMEOUT
+        while True:
+            with db.transaction(immediate=True) as conn:
+                if conn.execute(ScheduleJobRunner.CLAIM_QUERY, (time.time(), job_id)).rowcount:
+                    return True
+                status, cancelled = conn.execute("SELECT status, cancel_requested FROM schedule_jobs WHERE job_id = ?",
+                                                 (job_id,)).fetchone()
+            if status != "queued":
+                print(f"⚠️ Schedule job {job_id} is {status}, not starting it")
+                return False
+            if cancelled:
+                ScheduleJobRunner._update(job_id, status="cancelled")
+                print(f"⚠️ Schedule job {job_id} cancelled")
+                return False
+            if time.time() >= deadline:
+                ScheduleJobRunner._update(job_id, status="failed", error="Another schedule job is running")
+                print(f"❌ Schedule job {job_id} gave up waiting for another schedule job")
+                return False
+            # The running job may belong to a process that died without a restart of this one
+            ScheduleJobRunner.recover()
+            time.sleep(ScheduleJobRunner.CLAIM_RETRY)
+
+    @staticmethod
+    def _run(job_id, mode, incremental, notify, daily_capacity=None):
+        progress = ScheduleJobRunner._progress(job_id)
+        try:
+            if not ScheduleJobRunner._claim(job_id):
+                return
+            scheduler = InterviewScheduler(daily_capacity=daily_capacity, incremental=incremental, progress=progress)
+            summary = scheduler.generate_schedule(mode)
+            if not scheduler.store_schedule_in_db():
+                raise RuntimeError("Storing the schedule failed")
+            # Dashboards read scores for the scheduled pairs from pair_scores; refresh them before reporting done
+            ScheduleJobRunner._update(job_id, stage="refreshing_scores")
+            try:
+                PairScoreStore.refresh()
+            except Exception as e:
+                print(f"⚠️ Schedule job {job_id} could not refresh pair scores: {e}")
+            ScheduleJobRunner._update(job_id, status="done", done=len(scheduler.schedule), summary=json.dumps(summary))
+            print(f"✅ Schedule job {job_id} stored {len(scheduler.schedule)} interviews")
+            if notify:
+                # Notifications can take minutes for large schedules; don't hold up the next job
+                ScheduleJobRunner._update(job_id, notify_status="sending")
+                threading.Thread(target=ScheduleJobRunner._notify, args=(job_id,), name="schedule-notifier").start()
+        except ScheduleCancelled:
+            ScheduleJobRunner._update(job_id, status="cancelled")
+            print(f"⚠️ Schedule job {job_id} cancelled")
+        except Exception as e:
+            print(f"❌ Error in schedule job {job_id}: {e}")
+            try:
+                ScheduleJobRunner._update(job_id, status="failed", error=str(e))
+            except Exception as update_error:
+                print(f"❌ Error recording failure of schedule job {job_id}: {update_error}")
+
+    @staticmethod
+    def _notify(job_id):
+        """Sends the schedule notifications and records their outcome on the job."""
+        try:
+            summary = ScheduleNotifier.notify_schedule()
+            ScheduleJobRunner._update(job_id, notify_status="failed" if summary["failed"] else "sent",
+                                      notify_summary=json.dumps(summary))
+        except Exception as e:
+            print(f"❌ Error notifying for schedule job {job_id}: {e}")
+            try:
+                ScheduleJobRunner._update(job_id, notify_status="failed", notify_error=str(e))
+            except Exception as update_error:
+                print(f"❌ Error recording notification failure of schedule job {job_id}: {update_error}")
+
+    @staticmethod
+    def _is_alive(pid):
+        if pid == os.getpid():
+            return True
+        if os.name == "nt":
+            # os.kill would terminate the process on Windows; run a single web process there
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def recover():
+        """Fails queued or running jobs, and unfinished notifications, whose process has exited."""
+        try:
+            with db.transaction(immediate=True) as conn:
+                rows = conn.execute("""
+                    SELECT job_id, status, worker_pid FROM schedule_jobs
+                    WHERE status IN ('queued', 'running') OR notify_status = 'sending'
+                """).fetchall()
+                orphaned = [(job_id, status) for job_id, status, pid in rows
+                            if pid is None or not ScheduleJobRunner._is_alive(pid)]
+                now = time.time()
+                for job_id, status in orphaned:
+                    if status in ("queued", "running"):
+                        conn.execute("""
+                            UPDATE schedule_jobs SET status = 'failed', error = 'Interrupted by a restart', updated_at = ?
+                            WHERE job_id = ?
+                        """, (now, job_id))
+                    conn.execute("""
+                        UPDATE schedule_jobs SET notify_status = 'failed', notify_error = 'Interrupted by a restart', updated_at = ?
+                        WHERE job_id = ? AND notify_status = 'sending'
+                    """, (now, job_id))
+            if orphaned:
+                print(f"🧹 Marked {len(orphaned)} interrupted schedule jobs as failed")
+            return len(orphaned)
+        except Exception as e:
+            print(f"❌ Error recovering schedule jobs: {e}")
+            return 0
+
+    @staticmethod
+    def cancel(job_id):
+        """Requests cancellation; returns False if the job is unknown or already finished."""
+        with db.transaction() as conn:
+            return conn.execute("""
+                UPDATE schedule_jobs SET cancel_requested = 1, updated_at = ?
+                WHERE job_id = ? AND status IN ('queued', 'running')
+            """, (time.time(), job_id)).rowcount > 0
+
+    @staticmethod
+    def status(job_id):
+        """Returns the job's status fields, or None for an unknown job ID."""
+        with db.get_connection() as conn:
+            row = conn.execute(ScheduleJobRunner.STATUS_QUERY, (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(ScheduleJobRunner.STATUS_COLUMNS, row))
+        job["incremental"] = bool(job["incremental"])
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        job["notify_summary"] = json.loads(job["notify_summary"]) if job["notify_summary"] else None
+        return job
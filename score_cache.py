@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataload import DataLoader
+
+class ScoreCache:
+    """
+    Process-wide cache of score maps keyed on the score data version.
+    The version is bumped by triggers on the tables the scores are computed from,
+    so cached maps stay valid until the next write and only the first read after it recomputes.
+    Entries are evicted least recently used first once their estimated size exceeds MAX_BYTES.
+    """
+    MAX_BYTES = int(os.getenv("SCORE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    _entries = OrderedDict()
+    _sizes = {}
+    _bytes = 0
+    _lock = threading.Lock()
+    _compute_lock = threading.Lock()
+
+    @staticmethod
+    def _lookup(key):
+        with ScoreCache._lock:
+            scores = ScoreCache._entries.get(key)
+            if scores is not None:
+                ScoreCache._entries.move_to_end(key)
+            return scores
+
+    @staticmethod
+    def size_of(scores):
+        """Estimated bytes held by a score array, or by a dict of tuple keys and values and its contents."""
+        if hasattr(scores, "nbytes"):
+            return scores.nbytes
+        size = sys.getsizeof(scores)
+        for key, value in scores.items():
+            for item in (key, value):
+                size += sys.getsizeof(item)
+                if isinstance(item, tuple):
+                    size += sum(sys.getsizeof(part) for part in item)
+        return size
+
+    @staticmethod
+    def _evict(key):
+        del ScoreCache._entries[key]
+        ScoreCache._bytes -= ScoreCache._sizes.pop(key)
+
+    @staticmethod
+    def _store(key, scores):
+        name, version = key
+        size = ScoreCache.size_of(scores)
+        with ScoreCache._lock:
+            # Maps for an older version of the same scores can never be read again
+            for stale_key in [k for k in ScoreCache._entries if k[0] == name and k[1] != version]:
+                ScoreCache._evict(stale_key)
+            if size > ScoreCache.MAX_BYTES:
+                print(f"⚠️ Not caching '{name}' scores: {size} bytes exceed the {ScoreCache.MAX_BYTES} byte limit.")
+                return False
+            if key in ScoreCache._entries:
+                ScoreCache._evict(key)
+            ScoreCache._entries[key] = scores
+            ScoreCache._sizes[key] = size
+            ScoreCache._bytes += size
+            while ScoreCache._bytes > ScoreCache.MAX_BYTES:
+                ScoreCache._evict(next(iter(ScoreCache._entries)))
+            return True
+
+    @staticmethod
+    def get_or_compute(name, compute_fn, version=None):
+        """
+        Returns the cached scores for name at the given data version (the current one by default),
+        computing them on a miss.
+        """
+        if version is None:
+            version = DataLoader.get_data_version()
+        if version is None:
+            return compute_fn()
+
+        key = (name, version)
+        scores = ScoreCache._lookup(key)
+        if scores is not None:
+            return scores
+
+        # Serialize recomputation so concurrent misses after a write compute only once
+        with ScoreCache._compute_lock:
+            scores = ScoreCache._lookup(key)
+            if scores is not None:
+                return scores
+            scores = compute_fn()
+            if scores is not None and len(scores) and ScoreCache._store(key, scores):
+                print(f"✅ Cached '{name}' scores for data version {version}.")
+        return scores
+
+    @staticmethod
+    def clear():
+        with ScoreCache._lock:
+            ScoreCache._entries.clear()
+            ScoreCache._sizes.clear()
+            ScoreCache._bytes = 0
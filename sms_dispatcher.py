@@ -0,0 +1,91 @@
+import os
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class SmsDispatcher:
+    """
+    Sends SMS through Fast2SMS on one pooled keep-alive HTTP session shared by every call.
+    dispatch() queues the send on a background thread pool and returns its Future as the
+    delivery handle, so request handlers never wait on the provider.
+    """
+    # Point at sms_stub_server.py (e.g. http://127.0.0.1:8765/dev/bulkV2) to run offline
+    URL = os.getenv("FAST2SMS_URL", "https://www.fast2sms.com/dev/bulkV2")
+    WORKERS = int(os.getenv("SMS_WORKERS", 8))
+    TIMEOUT = 10
+    _session = None
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def session():
+        """Returns the shared session, whose connection pool holds one connection per worker."""
+        with SmsDispatcher._lock:
+            if SmsDispatcher._session is None:
+                session = requests.Session()
+                # Configure retries with backoff
+                retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+                adapter = HTTPAdapter(max_retries=retries, pool_connections=1, pool_maxsize=SmsDispatcher.WORKERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                SmsDispatcher._session = session
+            return SmsDispatcher._session
+
+    @staticmethod
+    def _executor_instance():
+        with SmsDispatcher._lock:
+            if SmsDispatcher._executor is None:
+                SmsDispatcher._executor = ThreadPoolExecutor(max_workers=SmsDispatcher.WORKERS, thread_name_prefix="sms")
+            return SmsDispatcher._executor
+
+    @staticmethod
+    def send(numbers, message, api_key):
+        """
+        Posts one message to one or more comma-separated numbers and blocks until the provider answers.
+        Returns {"return": bool, "message": str}.
+        """
+        payload = {
+            "message": message,
+            "language": "english",
+            "route": "q",
+            "numbers": numbers,
+        }
+        headers = {
+            "authorization": api_key,
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+
+        print(f"📤 Sending SMS to {numbers} with message: {message}")
+        try:
+            response = SmsDispatcher.session().post(SmsDispatcher.URL, data=payload, headers=headers, timeout=SmsDispatcher.TIMEOUT)
+            response.raise_for_status()
+            response_data = response.json()
+            print(f"✅ SMS API Response: {response_data}")
+
+            if isinstance(response_data, dict) and response_data.get("return", False):
+                return {"return": True, "message": "SMS sent successfully"}
+            else:
+                error_msg = response_data.get("message", "Unknown API error") if isinstance(response_data, dict) else "Invalid response format"
+                print(f"❌ API returned error: {error_msg}")
+                return {"return": False, "message": error_msg}
+
+        except requests.exceptions.HTTPError as e:
+            error_text = e.response.text if hasattr(e, 'response') and hasattr(e.response, 'text') else str(e)
+            print(f"❌ HTTP Error: {error_text}")
+            return {"return": False, "message": f"HTTP error: {error_text}"}
+        except requests.exceptions.Timeout:
+            print("❌ Request timed out")
+            return {"return": False, "message": "SMS service timed out"}
+        except requests.exceptions.ConnectionError as e:
+            print(f"❌ Connection Error: {e}")
+            return {"return": False, "message": "Failed to connect to SMS service: Network or DNS issue"}
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Request Error: {e}")
+            return {"return": False, "message": f"Request error: {str(e)}"}
+
+    @staticmethod
+    def dispatch(numbers, message, api_key):
+        """Queues send() in the background and returns its Future, the delivery handle."""
+        return SmsDispatcher._executor_instance().submit(SmsDispatcher.send, numbers, message, api_key)
@@ -0,0 +1,67 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+class StubSmsHandler(BaseHTTPRequestHandler):
+    """Answers bulkV2-style POSTs like Fast2SMS, after the server's latency, failing at its fail rate."""
+    # Keep-alive, so pooled clients reuse their connections as they would against the real API
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, keep-alive replies stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        time.sleep(self.server.latency)
+        numbers = [number for number in form.get("numbers", [""])[0].split(",") if number]
+        if not self.headers.get("authorization"):
+            self._reply(401, {"return": False, "status_code": 412, "message": "Invalid Authentication, Check Authorization Key"})
+        elif not numbers or not form.get("message"):
+            self._reply(400, {"return": False, "status_code": 411, "message": "Invalid Numbers"})
+        elif random.random() < self.server.fail_rate:
+            self._reply(500, {"return": False, "message": "Stub failure"})
+        else:
+            with self.server.lock:
+                self.server.requests += 1
+                self.server.recipients += len(numbers)
+            self._reply(200, {"return": True, "request_id": uuid.uuid4().hex, "message": ["SMS sent successfully."]})
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def start(port=0, latency=0.0, fail_rate=0.0):
+    """Serves the stub on a background thread and returns the server; its URL is server.url."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubSmsHandler)
+    server.daemon_threads = True
+    server.latency, server.fail_rate = latency, fail_rate
+    server.lock, server.requests, server.recipients = threading.Lock(), 0, 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/dev/bulkV2"
+    threading.Thread(target=server.serve_forever, name="sms-stub", daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    # python sms_stub_server.py [--port 8765] [--latency 0.2] [--fail-rate 0.0], then FAST2SMS_URL=<printed url>
+    parser = argparse.ArgumentParser(description="Local stand-in for the Fast2SMS bulkV2 API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    args = parser.parse_args()
+    server = start(args.port, args.latency, args.fail_rate)
+    print(f"✅ Stub SMS API listening at {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
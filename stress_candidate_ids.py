@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import db
+import migrations
+from password import generate_candidate_id, reserve_candidate_ids, store_candidate_data
+
+BLOCK_SIZE = 25
+
+def _signups(worker, db_path, signups, threads):
+    """Runs signups concurrent signups (allocate + store) from threads threads in this process."""
+    db.set_db_path(db_path)
+
+    def signup(i):
+        candidate_id = generate_candidate_id()
+        store_candidate_data(candidate_id, f"Worker {worker} #{i}", f"w{worker}.{i}@example.com",
+                             "9000000000", 25, 0, 1200, "Aerospace")
+        return candidate_id
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(signup, range(signups)))
+
+def _bulk_blocks(db_path, blocks):
+    """Reserves blocks ID ranges the way bulk importer batches do."""
+    db.set_db_path(db_path)
+    return [candidate_id for _ in range(blocks) for candidate_id in reserve_candidate_ids(BLOCK_SIZE)]
+
+def run(processes=8, signups=50, threads=4, blocks=10):
+    """
+    Hammers the allocator from processes x threads parallel signups plus one bulk reserver per
+    process, then checks that no ID was handed out twice and no applicant row was overwritten.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "stress.db")
+        db.set_db_path(db_path)
+        migrations.migrate()
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes * 2) as pool:
+            signup_futures = [pool.submit(_signups, worker, db_path, signups, threads) for worker in range(processes)]
+            block_futures = [pool.submit(_bulk_blocks, db_path, blocks) for _ in range(processes)]
+            signup_ids = [candidate_id for future in signup_futures for candidate_id in future.result()]
+            block_ids = [candidate_id for future in block_futures for candidate_id in future.result()]
+        elapsed = time.perf_counter() - started
+
+        all_ids = signup_ids + block_ids
+        duplicates = len(all_ids) - len(set(all_ids))
+        with db.get_connection() as conn:
+            stored = conn.execute("SELECT COUNT(*) FROM Interviewee").fetchone()[0]
+        db.close_connection()
+
+    print(f"{len(signup_ids)} signups and {len(block_ids)} block-reserved IDs in {elapsed:.2f}s "
+          f"({len(all_ids) / elapsed:.0f} IDs/s)")
+    print(f"duplicate IDs: {duplicates}, stored applicants: {stored} of {len(signup_ids)}")
+    if duplicates or stored != len(signup_ids):
+        print("❌ Candidate ID allocation is not safe under concurrency.")
+        return False
+    print("✅ No duplicate candidate IDs and no overwritten applicants.")
+    return True
+
+if __name__ == '__main__':
+    # python stress_candidate_ids.py [processes] [signups per process] [threads per process]
+    sys.exit(0 if run(*[int(arg) for arg in sys.argv[1:4]]) else 1)
@@ -0,0 +1,159 @@
+import argparse
+import os
+import threading
+import time
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+import db
+from dataload import DataLoader
+
+class TfidfModel:
+    """
+    Fitted TF-IDF vectorizer and interviewer-side TF-IDF matrix, persisted next to the database
+    and reloaded whenever the file changes, so scheduled refits reach running processes. Candidates are transformed with the stored vocabulary and scored
+    against the cached interviewer matrix; full refits are an explicit, scheduled operation.
+    """
+    # Fixed model file location; by default the model lives next to the current database
+    MODEL_PATH = os.getenv("TFIDF_MODEL_PATH")
+    # Refit once this share of interviewee field tokens is missing from the fitted vocabulary
+    DRIFT_THRESHOLD = float(os.getenv("TFIDF_DRIFT_THRESHOLD", 0.05))
+    _model = None
+    # Path and modification time of the model file _model was read from or written to
+    _model_path = None
+    _model_mtime = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def model_path():
+        """Resolved on every use, so db.set_db_path() also moves the model."""
+        return TfidfModel.MODEL_PATH or os.path.join(os.path.dirname(db.DB_PATH), "tfidf_model.joblib")
+
+    @staticmethod
+    def _fields(df, column):
+        return df[column].fillna('').astype(str).tolist()
+
+    @staticmethod
+    def _interviewer_key(snapshot):
+        return list(zip(snapshot.interviewers["interviewer_id"].tolist(),
+                        TfidfModel._fields(snapshot.interviewers, "field_of_expertise")))
+
+    @staticmethod
+    def fit(snapshot=None):
+        """Fits the vectorizer on the full interviewee + interviewer corpus and persists it."""
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        interviewee_fields = TfidfModel._fields(snapshot.interviewees, "core_field")
+        interviewer_fields = TfidfModel._fields(snapshot.interviewers, "field_of_expertise")
+
+        vectorizer = TfidfVectorizer()
+        tfidf_matrix = vectorizer.fit_transform(interviewee_fields + interviewer_fields)
+        model = {
+            "vectorizer": vectorizer,
+            "interviewer_matrix": tfidf_matrix[len(interviewee_fields):],
+            "interviewers": TfidfModel._interviewer_key(snapshot),
+            "data_version": snapshot.data_version,
+            "fitted_at": time.time(),
+        }
+
+        path = TfidfModel.model_path()
+        with TfidfModel._lock:
+            try:
+                # Write to a temporary file first so concurrent readers never see a partial model
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                joblib.dump(model, tmp_path)
+                os.replace(tmp_path, path)
+                TfidfModel._model_mtime = TfidfModel._file_mtime(path)
+            except Exception as e:
+                print(f"❌ Error saving TF-IDF model: {e}")
+            TfidfModel._model = model
+            TfidfModel._model_path = path
+        print(f"✅ Fitted TF-IDF model on {len(interviewee_fields) + len(interviewer_fields)} documents.")
+        return model
+
+    @staticmethod
+    def _file_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def load():
+        """
+        Returns the persisted model, or None if there is none. The file is read again whenever its
+        modification time changes, e.g. after `python tfidf_model.py` refit it in another process.
+        """
+        path = TfidfModel.model_path()
+        mtime = TfidfModel._file_mtime(path)
+        with TfidfModel._lock:
+            if path != TfidfModel._model_path:
+                # A model fitted for another database never applies to this one
+                TfidfModel._model, TfidfModel._model_path, TfidfModel._model_mtime = None, path, None
+            if mtime is not None and mtime != TfidfModel._model_mtime:
+                # Record the mtime even on failure so a broken file is not re-read on every call
+                TfidfModel._model_mtime = mtime
+                try:
+                    TfidfModel._model = joblib.load(path)
+                    print(f"✅ Loaded TF-IDF model from {path}")
+                except Exception as e:
+                    print(f"❌ Error loading TF-IDF model: {e}")
+            return TfidfModel._model
+
+    @staticmethod
+    def get(snapshot):
+        """Returns a model whose interviewer matrix matches the snapshot, fitting one only if needed."""
+        model = TfidfModel.load()
+        if model is None or model["interviewers"] != TfidfModel._interviewer_key(snapshot):
+            return TfidfModel.fit(snapshot)
+        return model
+
+    @staticmethod
+    def score_candidate(core_field):
+        """Returns (interviewer_id, score) of the best cached interviewer for a new candidate, or None."""
+        model = TfidfModel.load()
+        if model is None:
+            return None
+        scores = cosine_similarity(model["vectorizer"].transform([str(core_field or '')]), model["interviewer_matrix"])[0]
+        if not len(scores):
+            return None
+        best = scores.argmax()
+        if scores[best] <= 0:
+            return None
+        return model["interviewers"][best][0], scores[best]
+
+    @staticmethod
+    def measure_drift(snapshot, model=None):
+        """Returns the share of interviewee field tokens that are not in the fitted vocabulary."""
+        model = model or TfidfModel.load()
+        if model is None:
+            return 1.0
+        analyzer = model["vectorizer"].build_analyzer()
+        vocabulary = model["vectorizer"].vocabulary_
+        tokens = [token for field in TfidfModel._fields(snapshot.interviewees, "core_field") for token in analyzer(field)]
+        if not tokens:
+            return 0.0
+        return sum(token not in vocabulary for token in tokens) / len(tokens)
+
+    @staticmethod
+    def refit_if_drifted(snapshot=None, threshold=None, force=False):
+        """Scheduled maintenance: refits when forced, when no model exists or when drift exceeds threshold."""
+        if snapshot is None:
+            snapshot = DataLoader.load_snapshot()
+        threshold = TfidfModel.DRIFT_THRESHOLD if threshold is None else threshold
+        model = TfidfModel.load()
+        drift = TfidfModel.measure_drift(snapshot, model)
+        if force or model is None or drift > threshold or model["interviewers"] != TfidfModel._interviewer_key(snapshot):
+            print(f"🔄 Refitting TF-IDF model (drift {drift:.3f}, threshold {threshold:.3f}).")
+            return TfidfModel.fit(snapshot)
+        print(f"✅ TF-IDF model is current (drift {drift:.3f}, threshold {threshold:.3f}).")
+        return model
+
+if __name__ == '__main__':
+    # Run from a scheduler (e.g. cron): python tfidf_model.py [--force] [--drift-threshold 0.05]
+    parser = argparse.ArgumentParser(description="Refit the TF-IDF model when it no longer fits the data.")
+    parser.add_argument("--force", action="store_true", help="refit even if the model is current")
+    parser.add_argument("--drift-threshold", type=float, default=None,
+                        help=f"share of unknown interviewee tokens that triggers a refit (default {TfidfModel.DRIFT_THRESHOLD})")
+    args = parser.parse_args()
+    TfidfModel.refit_if_drifted(threshold=args.drift_threshold, force=args.force)